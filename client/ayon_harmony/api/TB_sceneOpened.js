@@ -19,11 +19,25 @@ function Client() {
     var self = this;
     /** socket */
     self.socket = new QTcpSocket(this);
-    /** receiving data buffer */
-    self.received = '';
     self.messageId = 1;
+    /** debug logging, enabled by AYON_HARMONY_IPC_TRACE env variable */
+    var traceValue = String(System.getenv('AYON_HARMONY_IPC_TRACE'));
+    self.debug = ['1', 'true', 'yes', 'on'].indexOf(
+        traceValue.toLowerCase()) > -1;
+    /** receiving data buffer */
     self.buffer = new QByteArray();
     self.waitingForData = 0;
+    /** complete messages waiting to be processed, in received order */
+    self.messageQueue = [];
+    self.compressedFrame = false;
+    /** compress messages bigger than this if server supports it */
+    self.compressionThreshold = 64 * 1024;
+    /** capabilities announced by server */
+    self.serverCapabilities = {};
+    /** codec used to decode and encode whole messages at once */
+    self.codec = QTextCodec.codecForName(new QByteArray().append('UTF-8'));
+    /** callbacks waiting for result of requests sent to server */
+    self.pendingCallbacks = {};
 
 
     /**
@@ -65,8 +79,7 @@ function Client() {
      * @return  {string} prettified json string
      */
     self.prettifyJson = function(json) {
-        var jsonString = JSON.stringify(json);
-        return JSON.stringify(JSON.parse(jsonString), null, 2);
+        return JSON.stringify(json, null, 2);
     };
 
     /**
@@ -75,6 +88,9 @@ function Client() {
      * @param {string} data - message
      */
     self.logDebug = function(data) {
+        if (!self.debug) {
+            return;
+        }
         var message = typeof(data.message) != 'undefined' ? data.message : data;
         MessageLog.trace('(DEBUG): ' + message.toString());
     };
@@ -141,9 +157,61 @@ function Client() {
         timer.start();
     };
 
+    /**
+     * Call single function described by request.
+     * @function
+     * @param  {object} call - object with `function` and optional `args`
+     * @return {object} result of called function or error message.
+     */
+    self.callFunction = function(call) {
+        try {
+            var _func = eval.call(null, call["function"]);
+
+            if (call.args == null) {
+                return _func();
+            }
+            return _func(call.args);
+        } catch (error) {
+            return 'Error processing request.\n' +
+                   'Request:\n' +
+                   self.prettifyJson(call) + '\n' +
+                   'Error:\n' + error;
+        }
+    };
+
+    /**
+     * Get lazily loaded modules needed by called functions, which are not
+     * loaded in Harmony yet.
+     * @function
+     * @param  {object} request - received request JSON
+     * @return {array} names of missing modules.
+     */
+    self.getMissingModules = function(request) {
+        var missing = [];
+        if (typeof AyonHarmony === 'undefined' ||
+                typeof AyonHarmony.getMissingModule !== 'function') {
+            return missing;
+        }
+        var calls = [];
+        if (typeof request["function"] !== 'undefined') {
+            calls = [request];
+        } else if (typeof request.batch !== 'undefined') {
+            calls = request.batch;
+        }
+        for (var i = 0; i < calls.length; ++i) {
+            var module = AyonHarmony.getMissingModule(
+                String(calls[i]["function"]));
+            if (module !== null && missing.indexOf(module) < 0) {
+                missing.push(module);
+            }
+        }
+        return missing;
+    };
+
     /**
      * Process received request. This will eval received function and produce
-     * results.
+     * results. Request with `batch` list of calls is processed in one go
+     * and its result is array of results in the same order.
      * @function
      * @param  {object} request - received request JSON
      * @return {object} result of evaled function.
@@ -152,11 +220,30 @@ function Client() {
         var mid = request.message_id;
         if (typeof request.reply !== 'undefined') {
             self.logDebug('['+ mid +'] *** received reply.');
+            var callback = self.pendingCallbacks[mid];
+            if (typeof callback !== 'undefined') {
+                delete self.pendingCallbacks[mid];
+                try {
+                    callback(request.result, request.error);
+                } catch (error) {
+                    self.logError(error);
+                }
+            }
             return;
         }
-        self.logDebug('['+ mid +'] - Processing: ' + self.prettifyJson(request));
+        if (self.debug) {
+            self.logDebug('['+ mid +'] - Processing: ' + self.prettifyJson(request));
+        }
         var result = null;
 
+        var missingModules = self.getMissingModules(request);
+        if (missingModules.length > 0) {
+            // Server injects the modules and sends the request again.
+            self.logDebug('[' + mid + '] Missing modules: ' + missingModules);
+            request.missing_modules = missingModules;
+            return result;
+        }
+
         if (typeof request.script !== 'undefined') {
             self.logDebug('[' + mid + '] Injecting script.');
             try {
@@ -165,19 +252,13 @@ function Client() {
                 self.logError(error);
             }
         } else if (typeof request["function"] !== 'undefined') {
-            try {
-                var _func = eval.call(null, request["function"]);
-
-                if (request.args == null) {
-                    result = _func();
-                } else {
-                    result = _func(request.args);
-                }
-            } catch (error) {
-                result = 'Error processing request.\n' +
-                         'Request:\n' +
-                         self.prettifyJson(request) + '\n' +
-                         'Error:\n' + error;
+            result = self.callFunction(request);
+        } else if (typeof request.batch !== 'undefined') {
+            self.logDebug('[' + mid + '] Processing batch of ' +
+                          request.batch.length + ' calls.');
+            result = [];
+            for (var i = 0; i < request.batch.length; ++i) {
+                result.push(self.callFunction(request.batch[i]));
             }
         } else {
             self.logError('Command type not implemented.');
@@ -200,68 +281,116 @@ function Client() {
         self.processBuffer();
     };
 
+    /**
+     * Unpack 32bit unsigned integer from 4 bytes of QByteArray.
+     * @function
+     * @param  {QByteArray} data   bytes to read from
+     * @param  {int}        offset index of first byte
+     * @return {int} 32bit unsigned integer.
+     */
+    self.unpackBytes = function(data, offset) {
+        var result = 0;
+        for (var i = 0; i < 4; ++i) {
+            // data in QByteArray come out as signed bytes.
+            result = result * 256 + (data.at(offset + i) & 0xff);
+        }
+        return result;
+    };
+
     /**
      * Process data received in buffer.
      * This detects messages by looking for header and message length.
+     * All complete messages are moved from buffer to message queue first,
+     * consumed data are removed from buffer only once. Queue is processed
+     * after that, in received order.
+     *
+     * Processing of message may run nested event loop (e.g. modal dialog),
+     * data received meanwhile are processed by nested call of this function
+     * from the same queue, so requests from server don't wait until the
+     * dialog is closed.
      * @function
      */
     self.processBuffer = function() {
-        var length = self.waitingForData;
-        if (self.waitingForData == 0) {
-            // read header from the buffer and remove it
-            var header_data = self.buffer.mid(0, 6);
-            self.buffer = self.buffer.remove(0, 6);
-
-            // convert header to string
-            var header = '';
-            for (var i = 0; i < header_data.size(); ++i) {
-                // data in QByteArray come out as signed bytes.
-                var unsigned = header_data.at(i) & 0xff;
-                header = header.concat(String.fromCharCode(unsigned));
-            }
+        var offset = 0;
+        try {
+            while (true) {
+                var bufferSize = self.buffer.size();
+                var length = self.waitingForData;
+                if (length == 0) {
+                    if (bufferSize - offset < 6) {
+                        // header is not complete yet.
+                        break;
+                    }
+                    // 'A' and 'H' (or 'Z' for compressed frame) magic
+                    // bytes followed by length.
+                    if (self.buffer.at(offset) != 65 ||
+                            (self.buffer.at(offset + 1) != 72 &&
+                             self.buffer.at(offset + 1) != 90)) {
+                        self.logError('INVALID HEADER');
+                    }
+                    self.compressedFrame = self.buffer.at(offset + 1) == 90;
+                    length = self.unpackBytes(self.buffer, offset + 2);
+                    offset += 6;
+                }
 
-            // skip 'AH' and read only length, unpack it to integer
-            header = header.substr(2);
-            length = self.unpack(header);
-        }
+                self.logDebug(
+                    '--- Expected: ' + length + ' | Got: ' + (bufferSize - offset)
+                );
+                if (length > bufferSize - offset) {
+                    // we didn't received whole message.
+                    self.waitingForData = length;
+                    self.logDebug('... waiting for more data (' + length + ') ...');
+                    break;
+                }
+                self.waitingForData = 0;
 
-        var data = self.buffer.mid(0, length);
-        self.logDebug('--- Expected: ' + length + ' | Got: ' + data.size());
-        if (length > data.size()) {
-            // we didn't received whole message.
-            self.waitingForData = length;
-            self.logDebug('... waiting for more data (' + length + ') ...');
-            return;
+                var data = self.buffer.mid(offset, length);
+                offset += length;
+                if (self.compressedFrame) {
+                    data = qUncompress(data);
+                }
+                self.messageQueue.push(self.codec.toUnicode(data));
+            }
+        } finally {
+            if (offset > 0) {
+                self.buffer.remove(0, offset);
+            }
         }
-        self.waitingForData = 0;
-        self.buffer.remove(0, length);
 
-        for (var j = 0; j < data.size(); ++j) {
-            self.received = self.received.concat(String.fromCharCode(data.at(j)));
+        while (self.messageQueue.length > 0) {
+            self.processMessage(self.messageQueue.shift());
         }
+    };
 
-        // self.logDebug('--- Received: ' + self.received);
-        var to_parse = self.received;
-        var request = JSON.parse(to_parse);
+    /**
+     * Process single decoded message and send reply if needed.
+     * @function
+     * @param {string} message - JSON encoded request
+     */
+    self.processMessage = function(message) {
+        var request = null;
+        try {
+            request = JSON.parse(message);
+        } catch (error) {
+            self.logError('Invalid message received: ' + error);
+            return;
+        }
         var mid = request.message_id;
-        // self.logDebug('[' + mid + '] - Request: ' + '\n' + JSON.stringify(request));
         self.logDebug('[' + mid + '] Received.');
 
+        if (typeof request.capabilities !== 'undefined') {
+            self.serverCapabilities = request.capabilities || {};
+            return;
+        }
+
         request.result = self.processRequest(request);
         self.logDebug('[' + mid + '] Processing done.');
-        self.received = '';
 
         if (request.reply !== true) {
             request.reply = true;
             self.logDebug('[' + mid + '] Replying.');
             self._send(JSON.stringify(request));
         }
-
-        if ((length < data.size()) || (length < self.buffer.size())) {
-            // we've received more data.
-            self.logDebug('--- Got more data to process ...');
-            self.processBuffer();
-        }
     };
 
     /**
@@ -274,6 +403,14 @@ function Client() {
         self.socket.readyRead.connect(self.onReadyRead);
         var app = QCoreApplication.instance();
 
+        // Announce what this client supports, server replies with its own
+        // capabilities.
+        self.send({
+            'capabilities': {
+                'compression': self.canCompress() ? 'zlib' : null
+            }
+        });
+
         app.ayonClient.send(
             {
                 'module': 'ayon_core.lib',
@@ -289,18 +426,37 @@ function Client() {
       modify how content length is sent do the server.
       Content length is sent as string of 8 char convertible into integer
       (instead of 0x00000001[4 bytes] > "000000001"[8 bytes]) */
-      var codec_name = new QByteArray().append("UTF-8");
-
-      var codec = QTextCodec.codecForName(codec_name);
-      var msg = codec.fromUnicode(message);
+      var msg = self.codec.fromUnicode(message);
+      var magic = 'AH';
+      if (msg.size() >= self.compressionThreshold &&
+              self.serverCapabilities.compression === 'zlib' &&
+              self.canCompress()) {
+          var compressed = qCompress(msg, 1);
+          if (compressed.size() < msg.size()) {
+              msg = compressed;
+              magic = 'AZ';
+          }
+      }
       var l = msg.size();
-      var header = new QByteArray().append('AH').append(self.pack(l));
+      var header = new QByteArray().append(magic).append(self.pack(l));
       var coded = msg.prepend(header);
 
       self.socket.write(coded);
       self.logDebug('Sent.');
     };
 
+    /**
+     * Is zlib compression of messages available in this Harmony?
+     * @function
+     * @return {boolean}
+     */
+    self.canCompress = function() {
+        return (
+            typeof qCompress === 'function' &&
+            typeof qUncompress === 'function'
+        );
+    };
+
     self.waitForLock = function() {
         if (self._lock === false) {
             self.logDebug('>>> Unlocking ...');
@@ -313,12 +469,20 @@ function Client() {
 
     /**
      * Send request to server.
-     * @param {object} request - json encoded request.
+     * When callback is passed, server replies once the request is processed
+     * and callback is called with its result and error message (if any).
+     * @param {object}   request  - json encoded request.
+     * @param {function} callback - optional function(result, error).
      */
-    self.send = function(request) {
+    self.send = function(request, callback) {
         request.message_id = self.messageId;
-        if (typeof request.reply == 'undefined') {
-            self.logDebug("[" + self.messageId + "] sending:\n" + self.prettifyJson(request));
+        self.messageId += 1;
+        if (typeof callback === 'function') {
+            request.await_result = true;
+            self.pendingCallbacks[request.message_id] = callback;
+        }
+        if (self.debug && typeof request.reply == 'undefined') {
+            self.logDebug("[" + request.message_id + "] sending:\n" + self.prettifyJson(request));
         }
         self._send(JSON.stringify(request));
     };
@@ -357,6 +521,14 @@ function start() {
     if (app.ayonClient == null) {
         app.ayonClient = new Client();
         app.ayonClient.socket.connectToHost(host, port);
+    } else {
+        // Another scene was opened in the same session, cached scene
+        // metadata on server side are not valid anymore.
+        app.ayonClient.send({
+            'module': 'ayon_harmony.api.lib',
+            'method': 'invalidate_scene_data',
+            'args': []
+        }, false);
     }
     var mainWindow = null;
     var widgets = QApplication.topLevelWidgets();
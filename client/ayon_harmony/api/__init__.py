@@ -14,13 +14,18 @@ from .pipeline import (
     application_launch,
     export_backdrop_as_template,
     inject_ayon_js,
+    inject_js_bundle,
 )
 
 from .lib import (
     launch,
     imprint,
+    imprint_many,
     read,
     send,
+    send_batch,
+    ipc_stats,
+    reset_ipc_stats,
     maintained_nodes_state,
     save_scene,
     save_scene_as,
@@ -33,9 +38,17 @@ from .lib import (
     select_nodes,
     get_scene_data,
     set_scene_data,
+    patch_scene_data,
+    get_scene_data_keys,
+    flush_scene_data,
+    invalidate_scene_data,
+    deferred_scene_data_flush,
     get_all_top_names,
     get_palettes_paths,
     unzip_scene_file,
+    zip_directory,
+    get_archive_options,
+    wait_for_zip_and_move,
 )
 
 from .workio import (
@@ -61,12 +74,17 @@ __all__ = [
     "application_launch",
     "export_backdrop_as_template",
     "inject_ayon_js",
+    "inject_js_bundle",
 
     # lib
     "launch",
     "imprint",
+    "imprint_many",
     "read",
     "send",
+    "send_batch",
+    "ipc_stats",
+    "reset_ipc_stats",
     "maintained_nodes_state",
     "save_scene",
     "save_scene_as",
@@ -79,9 +97,17 @@ __all__ = [
     "select_nodes",
     "get_scene_data",
     "set_scene_data",
+    "patch_scene_data",
+    "get_scene_data_keys",
+    "flush_scene_data",
+    "invalidate_scene_data",
+    "deferred_scene_data_flush",
     "get_all_top_names",
     "get_palettes_paths",
     "unzip_scene_file",
+    "zip_directory",
+    "get_archive_options",
+    "wait_for_zip_and_move",
 
     # Workfiles API
     "open_file",
@@ -0,0 +1,1568 @@
+# -*- coding: utf-8 -*-
+"""Archiving of Harmony scene folders to zip workfiles.
+
+Scene archives are updated incrementally. Manifest stored next to the scene
+folder remembers size, modification time and hash of every file written to
+the last archive. Files which did not change since then are copied from the
+previous archive as they are, without being decompressed and compressed
+again, only new and changed files are compressed.
+
+Archiving can run in background `ArchiveQueue` which processes one job at
+a time. Newer job for the same scene folder replaces pending one and cancels
+the one in progress, so only the newest state of the folder is archived.
+"""
+import os
+import glob
+import json
+import shutil
+import struct
+import zlib
+import hashlib
+import logging
+import tempfile
+import time
+import uuid
+import zipfile
+import threading
+import collections
+import concurrent.futures
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+# Compressed members bigger than this are kept on disk until written.
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+# Size of fixed part of local file header, see zip specification.
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+# Flag marking that sizes and CRC follow compressed data.
+_DATA_DESCRIPTOR_FLAG = 0x08
+# Lock of scene folder not refreshed for this long is left by dead process.
+LOCK_STALE_TIMEOUT = 60
+
+
+class _ZipFile(zipfile.ZipFile):
+    """Extended check for windows invalid characters."""
+
+    # this is extending default zipfile table for few invalid characters
+    # that can come from Mac
+    _windows_illegal_characters = ":<>|\"?*\r\n\x00"
+    _windows_illegal_name_trans_table = str.maketrans(
+        _windows_illegal_characters,
+        "_" * len(_windows_illegal_characters)
+    )
+
+
+class ArchiveCancelled(Exception):
+    """Archiving was cancelled, e.g. by newer save of the same scene."""
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ArchiveCancelled("Archiving was cancelled.")
+
+
+def get_manifest_path(source):
+    """Path to manifest of scene folder.
+
+    Args:
+        source (str): Path to scene folder.
+
+    Returns:
+        str: Path to manifest file.
+
+    """
+    return os.path.normpath(source) + ".manifest.json"
+
+
+def _read_manifest(source):
+    manifest_path = get_manifest_path(source)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as stream:
+            manifest = json.load(stream)
+    except (OSError, ValueError):
+        log.warning(f"Invalid archive manifest '{manifest_path}'.")
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def load_manifest(source):
+    """Load manifest of scene folder if archive it describes is intact.
+
+    Args:
+        source (str): Path to scene folder.
+
+    Returns:
+        Optional[dict]: Manifest or None when missing or when the archive
+            was changed or removed since the manifest was written.
+
+    """
+    manifest = _read_manifest(source)
+    if manifest is None:
+        return None
+
+    archive = manifest.get("archive") or {}
+    archive_path = archive.get("path")
+    if not archive_path or not os.path.exists(archive_path):
+        return None
+    stat = os.stat(archive_path)
+    if (
+        stat.st_size != archive.get("size")
+        or stat.st_mtime_ns != archive.get("mtime_ns")
+    ):
+        log.debug(f"Archive '{archive_path}' changed since last save.")
+        return None
+    return manifest
+
+
+def save_manifest(source, archive_path, files):
+    """Store manifest of scene folder written to `archive_path`.
+
+    Args:
+        source (str): Path to scene folder.
+        archive_path (str): Path to archive the files were written to
+            or extracted from.
+        files (dict[str, dict]): Size, modification time, hash and CRC of
+            archived files by their name in archive.
+
+    """
+    stat = os.stat(archive_path)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "archive": {
+            "path": archive_path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        },
+        "last_used": time.time(),
+        "files": files,
+    }
+    _write_manifest(source, manifest)
+
+
+def touch_manifest(source):
+    """Mark scene folder as used now for least recently used eviction.
+
+    Args:
+        source (str): Path to scene folder.
+
+    """
+    manifest = _read_manifest(source)
+    if manifest is None:
+        return
+    manifest["last_used"] = time.time()
+    _write_manifest(source, manifest)
+
+
+def _write_manifest(source, manifest):
+    manifest_path = get_manifest_path(source)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as stream:
+        json.dump(manifest, stream)
+    os.replace(tmp_path, manifest_path)
+
+
+def remove_manifest(source):
+    """Remove manifest of scene folder if there is any.
+
+    Args:
+        source (str): Path to scene folder.
+
+    """
+    manifest_path = get_manifest_path(source)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def hash_file(path):
+    """Hash content of file.
+
+    Args:
+        path (str): Path to file.
+
+    Returns:
+        str: Hex digest of file content.
+
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_scene_files(source):
+    """Walk scene folder in stable order.
+
+    Yields:
+        tuple[str, str, bool]: Path, name in archive and if it is directory.
+
+    """
+    for root, dirnames, filenames in os.walk(source):
+        dirnames.sort()
+        filenames.sort()
+        relative_root = os.path.relpath(root, source)
+        if relative_root == os.curdir:
+            relative_root = ""
+        else:
+            relative_root = relative_root.replace(os.sep, "/") + "/"
+            yield root, relative_root, True
+
+        for filename in filenames:
+            yield (
+                os.path.join(root, filename),
+                relative_root + filename,
+                False,
+            )
+
+
+class CompressionPolicy:
+    """Decide if archive member is compressed or stored as it is.
+
+    Files with one of `store_extensions` (e.g. PNG drawings) are already
+    compressed and are stored. Other files are stored when compressing
+    sample of their beginning does not save at least `min_saving` of its
+    size, which is cheap estimate of data entropy.
+
+    Args:
+        store_extensions (Optional[Iterable[str]]): Extensions of files
+            which are always stored, case insensitive, with or without dot.
+        detect_incompressible (bool): Store files which don't compress.
+        min_saving (float): Minimal relative saving of compressed sample.
+
+    """
+    sample_size = 64 * 1024
+
+    def __init__(
+        self,
+        store_extensions=None,
+        detect_incompressible=True,
+        min_saving=0.05,
+    ):
+        self.store_extensions = {
+            "." + ext.lower().lstrip(".")
+            for ext in store_extensions or []
+            if ext
+        }
+        self.detect_incompressible = detect_incompressible
+        self.min_saving = min_saving
+
+    def get_compress_type(self, path, sample):
+        """Get compression of member.
+
+        Args:
+            path (str): Path to file.
+            sample (bytes): Beginning of file content.
+
+        Returns:
+            int: `zipfile.ZIP_STORED` or `zipfile.ZIP_DEFLATED`.
+
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext in self.store_extensions:
+            return zipfile.ZIP_STORED
+
+        sample = sample[:self.sample_size]
+        if self.detect_incompressible and len(sample) >= 1024:
+            compressed_size = len(zlib.compress(sample, 1))
+            if compressed_size > len(sample) * (1 - self.min_saving):
+                return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+
+class ArchiveStats:
+    """Statistics of written archive.
+
+    Attributes:
+        copied_files (int): Members copied from previous archive.
+        stored_files (int): Members stored without compression.
+        deflated_files (int): Compressed members.
+        stored_size (int): Size of stored members.
+        deflated_size (int): Size of compressed members before
+            compression.
+        compressed_size (int): Size of compressed members.
+        deflate_time (float): Seconds spent compressing, summed over all
+            threads.
+        elapsed_time (float): Seconds archiving took.
+
+    """
+
+    def __init__(self):
+        self.copied_files = 0
+        self.stored_files = 0
+        self.deflated_files = 0
+        self.stored_size = 0
+        self.deflated_size = 0
+        self.compressed_size = 0
+        self.deflate_time = 0.0
+        self.elapsed_time = 0.0
+
+    @property
+    def compression_ratio(self):
+        """Compressed size of deflated members relative to original size."""
+        if not self.deflated_size:
+            return 1.0
+        return self.compressed_size / self.deflated_size
+
+    @property
+    def estimated_time_saved(self):
+        """Seconds saved by storing members, estimated from deflate speed."""
+        if not self.deflated_size or not self.deflate_time:
+            return 0.0
+        return self.stored_size * self.deflate_time / self.deflated_size
+
+    def add(self, compressed):
+        if compressed.compress_type == zipfile.ZIP_STORED:
+            self.stored_files += 1
+            self.stored_size += compressed.file_size
+        else:
+            self.deflated_files += 1
+            self.deflated_size += compressed.file_size
+            self.compressed_size += compressed.spool.tell()
+            self.deflate_time += compressed.compress_time
+
+    def summary(self):
+        """Human readable summary.
+
+        Returns:
+            str: Summary of the statistics.
+
+        """
+        mb = 1024 * 1024
+        return (
+            f"{self.deflated_files} files compressed"
+            f" ({self.deflated_size / mb:.1f} MB"
+            f" to {self.compressed_size / mb:.1f} MB,"
+            f" ratio {self.compression_ratio:.2f}),"
+            f" {self.stored_files} stored"
+            f" ({self.stored_size / mb:.1f} MB,"
+            f" ~{self.estimated_time_saved:.1f}s of compression saved),"
+            f" {self.copied_files} copied unchanged"
+            f" in {self.elapsed_time:.1f}s"
+        )
+
+
+class _CompressedFile:
+    """Member compressed ahead of writing to archive."""
+
+    def __init__(
+        self, compress_type, spool, crc, file_size, file_hash, compress_time
+    ):
+        self.compress_type = compress_type
+        self.spool = spool
+        self.crc = crc
+        self.file_size = file_size
+        self.hash = file_hash
+        self.compress_time = compress_time
+
+
+def _compress_file(path, policy, compression_level, cancel_event):
+    """Compress file to temporary storage while hashing its content.
+
+    Runs in worker threads, `zlib` releases GIL while compressing. CRC and
+    size of compressed data are checked against the source here, so the
+    check runs in parallel as well.
+
+    Returns:
+        _CompressedFile: Compressed data with CRC and hash of file.
+
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    digest = hashlib.sha1()
+    crc = 0
+    file_size = 0
+    compress_time = 0.0
+    compress_type = None
+    compressor = None
+    checker = None
+    try:
+        with open(path, "rb") as stream:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                _check_cancelled(cancel_event)
+                if compress_type is None:
+                    compress_type = zipfile.ZIP_STORED
+                    if compression_level:
+                        compress_type = policy.get_compress_type(path, chunk)
+                    if compress_type == zipfile.ZIP_DEFLATED:
+                        # Raw deflate stream as used by zip format.
+                        compressor = zlib.compressobj(
+                            compression_level, zlib.DEFLATED, -15
+                        )
+                        checker = _CrcChecker()
+                crc = zlib.crc32(chunk, crc)
+                digest.update(chunk)
+                file_size += len(chunk)
+                if compressor is not None:
+                    start = time.perf_counter()
+                    chunk = compressor.compress(chunk)
+                    compress_time += time.perf_counter() - start
+                    checker.update(chunk)
+                spool.write(chunk)
+        if compressor is not None:
+            chunk = compressor.flush()
+            checker.update(chunk)
+            spool.write(chunk)
+            checker.check(path, crc, file_size)
+    except BaseException:
+        spool.close()
+        raise
+    if compress_type is None:
+        # Empty file.
+        compress_type = zipfile.ZIP_STORED
+    return _CompressedFile(
+        compress_type,
+        spool,
+        crc,
+        file_size,
+        digest.hexdigest(),
+        compress_time,
+    )
+
+
+class _CrcChecker:
+    """Check CRC of deflated data while they are produced."""
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(-15)
+        self._crc = 0
+        self._size = 0
+
+    def _add(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+
+    def update(self, chunk):
+        # Limit size of decompressed data held in memory at once.
+        self._add(self._decompressor.decompress(chunk, CHUNK_SIZE))
+        while self._decompressor.unconsumed_tail:
+            self._add(self._decompressor.decompress(
+                self._decompressor.unconsumed_tail, CHUNK_SIZE
+            ))
+
+    def check(self, path, crc, size):
+        self._add(self._decompressor.flush())
+        if self._crc != crc or self._size != size:
+            raise zipfile.BadZipFile(f"Bad CRC of compressed '{path}'.")
+
+
+def _append_member(zip_file, info, stream, size):
+    """Write member with known CRC and sizes to archive.
+
+    Data are written as they are, their CRC is checked before (see
+    `_compress_file` and `_copy_raw`), only their size is checked here.
+
+    Args:
+        zip_file (zipfile.ZipFile): Archive opened for writing.
+        info (zipfile.ZipInfo): Member info with CRC and sizes filled.
+        stream (BinaryIO): Stream positioned at start of compressed data.
+        size (int): Size of compressed data.
+
+    """
+    zip64 = (
+        info.file_size > zipfile.ZIP64_LIMIT
+        or info.compress_size > zipfile.ZIP64_LIMIT
+    )
+    fp = zip_file.fp
+    info.header_offset = fp.tell()
+    fp.write(info.FileHeader(zip64))
+
+    remaining = size
+    while remaining:
+        chunk = stream.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(
+                f"Unexpected end of '{info.filename}' data.")
+        fp.write(chunk)
+        remaining -= len(chunk)
+
+    zip_file.filelist.append(info)
+    zip_file.NameToInfo[info.filename] = info
+    zip_file.start_dir = fp.tell()
+    zip_file._didModify = True
+
+
+def _write_compressed(zip_file, path, arcname, compressed):
+    """Write member compressed by `_compress_file` to archive."""
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.compress_type = compressed.compress_type
+    info.CRC = compressed.crc
+    info.file_size = compressed.file_size
+    info.compress_size = compressed.spool.tell()
+    compressed.spool.seek(0)
+    try:
+        _append_member(
+            zip_file, info, compressed.spool, info.compress_size
+        )
+    finally:
+        compressed.spool.close()
+
+
+def _copy_raw(source_zip, source_info, zip_file, previous=None):
+    """Copy compressed member from another archive as it is.
+
+    CRC and size of member are compared with the manifest of the archive,
+    its data are not decompressed.
+
+    Args:
+        source_zip (zipfile.ZipFile): Archive opened for reading.
+        source_info (zipfile.ZipInfo): Member of `source_zip` to copy.
+        zip_file (zipfile.ZipFile): Archive opened for writing.
+        previous (Optional[dict]): Manifest entry of the member.
+
+    """
+    if previous is not None and (
+        previous.get("crc", source_info.CRC) != source_info.CRC
+        or previous["size"] != source_info.file_size
+    ):
+        raise zipfile.BadZipFile(
+            f"CRC of '{source_info.filename}' doesn't match manifest.")
+    source_fp = source_zip.fp
+    source_fp.seek(source_info.header_offset)
+    header = source_fp.read(_LOCAL_HEADER_SIZE)
+    if header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(
+            f"Bad local header of '{source_info.filename}'.")
+    filename_length, extra_length = struct.unpack("<HH", header[26:30])
+    source_fp.seek(
+        source_info.header_offset
+        + _LOCAL_HEADER_SIZE
+        + filename_length
+        + extra_length
+    )
+
+    info = zipfile.ZipInfo(source_info.filename, source_info.date_time)
+    info.compress_type = source_info.compress_type
+    info.create_system = source_info.create_system
+    info.create_version = source_info.create_version
+    info.extract_version = source_info.extract_version
+    info.external_attr = source_info.external_attr
+    info.internal_attr = source_info.internal_attr
+    # Sizes and CRC are known up front, no data descriptor is written.
+    info.flag_bits = source_info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    info.CRC = source_info.CRC
+    info.compress_size = source_info.compress_size
+    info.file_size = source_info.file_size
+    _append_member(zip_file, info, source_fp, info.compress_size)
+
+
+def _prepare_member(
+    path,
+    stat,
+    previous,
+    previous_info,
+    policy,
+    compression_level,
+    cancel_event,
+):
+    """Decide if file can be copied from previous archive or compress it.
+
+    Returns:
+        Union[str, _CompressedFile]: Hash of file when it can be copied
+            from previous archive, compressed file otherwise.
+
+    """
+    if previous_info is not None:
+        if previous["mtime_ns"] == stat.st_mtime_ns:
+            return previous["hash"]
+        if hash_file(path) == previous["hash"]:
+            return previous["hash"]
+    return _compress_file(path, policy, compression_level, cancel_event)
+
+
+def write_scene_archive(
+    source,
+    archive_path,
+    manifest=None,
+    progress_callback=None,
+    cancel_event=None,
+    compression_level=DEFAULT_COMPRESSION_LEVEL,
+    workers=None,
+    policy=None,
+    stats=None,
+    paranoid=False,
+):
+    """Write scene folder to zip archive.
+
+    Files are compressed in parallel by pool of threads and written to
+    archive in stable order. Files recorded in `manifest` with the same
+    size and either the same modification time or the same content hash
+    are copied from archive the manifest describes. CRC of compressed
+    members is checked by the compressing threads, CRC of copied members is
+    compared with the manifest. Written archive is read again only in
+    `paranoid` mode.
+
+    Args:
+        source (str): Path to scene folder.
+        archive_path (str): Path to archive to create.
+        manifest (Optional[dict]): Manifest of previous archive.
+        progress_callback (Optional[Callable[[int, int], None]]): Called
+            with number of processed bytes and total bytes after each file.
+        cancel_event (Optional[threading.Event]): Stop archiving with
+            `ArchiveCancelled` when set.
+        compression_level (int): Deflate compression level 0-9.
+        workers (Optional[int]): Number of compressing threads, number of
+            CPUs is used when not set.
+        policy (Optional[CompressionPolicy]): Decides which files are
+            stored without compression.
+        stats (Optional[ArchiveStats]): Filled with statistics of archive.
+        paranoid (bool): Read whole archive again after it is written
+            and check CRC of all members.
+
+    Returns:
+        dict[str, dict]: Size, modification time, hash and CRC of archived
+            files by their name in archive.
+
+    """
+    previous_files = {}
+    previous_zip = None
+    if manifest:
+        previous_files = manifest["files"]
+        try:
+            previous_zip = zipfile.ZipFile(manifest["archive"]["path"])
+        except (OSError, zipfile.BadZipFile):
+            log.warning("Previous archive can't be read, writing all files.")
+            previous_files = {}
+
+    scene_files = []
+    total_size = 0
+    for path, arcname, is_dir in _iter_scene_files(source):
+        stat = None if is_dir else os.stat(path)
+        if stat is not None:
+            total_size += stat.st_size
+        scene_files.append((path, arcname, stat))
+
+    if policy is None:
+        policy = CompressionPolicy()
+    if stats is None:
+        stats = ArchiveStats()
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    files = {}
+    processed_size = 0
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        with zipfile.ZipFile(
+            archive_path, "w", compression=zipfile.ZIP_DEFLATED
+        ) as zip_file:
+            # Limit files compressed ahead to keep temporary data small.
+            pending = collections.deque()
+            scene_files_iter = iter(scene_files)
+            while True:
+                while len(pending) < workers * 2:
+                    item = next(scene_files_iter, None)
+                    if item is None:
+                        break
+                    path, arcname, stat = item
+                    future = None
+                    previous_info = None
+                    if stat is not None:
+                        previous = previous_files.get(arcname)
+                        if previous and previous["size"] == stat.st_size:
+                            previous_info = previous_zip.NameToInfo.get(
+                                arcname)
+                        if (
+                            previous_info is not None
+                            and previous_info.file_size != stat.st_size
+                        ):
+                            previous_info = None
+                        future = pool.submit(
+                            _prepare_member,
+                            path,
+                            stat,
+                            previous,
+                            previous_info,
+                            policy,
+                            compression_level,
+                            cancel_event,
+                        )
+                    pending.append((item, previous_info, future))
+
+                if not pending:
+                    break
+
+                (path, arcname, stat), previous_info, future = (
+                    pending.popleft()
+                )
+                _check_cancelled(cancel_event)
+                if future is None:
+                    zip_file.write(path, arcname)
+                    continue
+
+                result = future.result()
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                if isinstance(result, str):
+                    _copy_raw(
+                        previous_zip,
+                        previous_info,
+                        zip_file,
+                        previous_files[arcname],
+                    )
+                    entry["hash"] = result
+                    entry["crc"] = previous_info.CRC
+                    stats.copied_files += 1
+                else:
+                    stats.add(result)
+                    _write_compressed(zip_file, path, arcname, result)
+                    entry["hash"] = result.hash
+                    entry["crc"] = result.crc
+                files[arcname] = entry
+
+                processed_size += stat.st_size
+                if progress_callback is not None:
+                    progress_callback(processed_size, total_size)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if previous_zip is not None:
+            previous_zip.close()
+
+    if paranoid:
+        with zipfile.ZipFile(archive_path) as zip_file:
+            bad_member = zip_file.testzip()
+        if bad_member is not None:
+            raise zipfile.BadZipFile(
+                f"File archive is corrupted, bad member '{bad_member}'.")
+
+    stats.elapsed_time = time.perf_counter() - start_time
+    log.info(f"Archived '{source}': {stats.summary()}")
+    return files
+
+
+def archive_scene(
+    source,
+    destination,
+    reference=None,
+    progress_callback=None,
+    cancel_event=None,
+    **kwargs
+):
+    """Archive scene folder and move the archive to `destination`.
+
+    Args:
+        source (str): Path to scene folder.
+        destination (str): Path to zip file.
+        reference (Optional[str]): Scene folder whose manifest is used
+            when `source` has none.
+        progress_callback (Optional[Callable[[int, int], None]]): Called
+            with number of processed bytes and total bytes.
+        cancel_event (Optional[threading.Event]): Stop archiving with
+            `ArchiveCancelled` when set.
+        **kwargs: Options of `write_scene_archive`, e.g. compression level.
+
+    """
+    source = os.path.normpath(source)
+    manifest = load_manifest(source)
+    if manifest is None and reference:
+        manifest = load_manifest(reference)
+
+    archive_path = source + ".zip"
+    try:
+        files = write_scene_archive(
+            source,
+            archive_path,
+            manifest,
+            progress_callback,
+            cancel_event,
+            **kwargs
+        )
+    except BaseException:
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+        raise
+
+    shutil.move(archive_path, destination)
+    save_manifest(source, os.path.abspath(destination), files)
+    log.debug(f"Saved '{source}' to '{destination}'")
+
+
+class ExtractStats:
+    """Statistics of localized archive.
+
+    Attributes:
+        extracted_files (int): Members decompressed from archive.
+        extracted_size (int): Size of decompressed members.
+        copied_files (int): Members copied from other local scene folders.
+        unchanged_files (int): Members already present in scene folder.
+        elapsed_time (float): Seconds localization took.
+
+    """
+
+    def __init__(self):
+        self.extracted_files = 0
+        self.extracted_size = 0
+        self.copied_files = 0
+        self.unchanged_files = 0
+        self.elapsed_time = 0.0
+
+    def summary(self):
+        """Human readable summary.
+
+        Returns:
+            str: Summary of the statistics.
+
+        """
+        return (
+            f"{self.extracted_files} files extracted"
+            f" ({self.extracted_size / (1024 * 1024):.1f} MB),"
+            f" {self.copied_files} copied from other local scenes,"
+            f" {self.unchanged_files} up to date"
+            f" in {self.elapsed_time:.1f}s"
+        )
+
+
+def _get_member_path(zip_file, target, info):
+    """Path where member is extracted, sanitized the same way as zipfile.
+
+    Args:
+        zip_file (zipfile.ZipFile): Opened archive.
+        target (str): Directory to extract to.
+        info (zipfile.ZipInfo): Member of archive.
+
+    Returns:
+        str: Path to extracted member.
+
+    """
+    arcname = info.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ("", os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(
+        part
+        for part in arcname.split(os.path.sep)
+        if part not in invalid_path_parts
+    )
+    if os.path.sep == "\\":
+        arcname = zip_file._sanitize_windows_name(arcname, os.path.sep)
+    return os.path.join(target, arcname)
+
+
+def _is_file_unchanged(path, entry):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return (
+        stat.st_size == entry["size"]
+        and stat.st_mtime_ns == entry["mtime_ns"]
+    )
+
+
+def _get_cached_files(cache_root, exclude):
+    """Index files of scene folders cached next to each other.
+
+    Args:
+        cache_root (str): Directory with cached scene folders.
+        exclude (str): Scene folder to skip.
+
+    Returns:
+        dict[tuple, tuple[str, dict]]: Path to file and its manifest entry
+            by name in archive, CRC and size.
+
+    """
+    cached_files = {}
+    for manifest_path in glob.glob(
+        os.path.join(glob.escape(cache_root), "*.manifest.json")
+    ):
+        scene_dir = manifest_path[:-len(".manifest.json")]
+        if scene_dir == exclude:
+            continue
+        manifest = _read_manifest(scene_dir)
+        if manifest is None:
+            continue
+        for name, entry in manifest["files"].items():
+            if "crc" not in entry:
+                continue
+            path = os.path.join(scene_dir, *name.split("/"))
+            cached_files[(name, entry["crc"], entry["size"])] = (path, entry)
+    return cached_files
+
+
+def _long_path(path):
+    """Path usable for file operations beyond 260 characters on Windows.
+
+    Args:
+        path (str): Path to file or directory.
+
+    Returns:
+        str: Extended-length path on Windows, `path` elsewhere.
+
+    """
+    if os.name != "nt" or path.startswith("\\\\?\\"):
+        return path
+    path = os.path.abspath(path)
+    if path.startswith("\\\\"):
+        return "\\\\?\\UNC\\" + path[2:]
+    return "\\\\?\\" + path
+
+
+def _extract_member(zip_file, info, path, cancel_event):
+    """Extract member while hashing its content.
+
+    Returns:
+        str: Hex digest of member content.
+
+    """
+    digest = hashlib.sha1()
+    with zip_file.open(info) as src, open(path, "wb") as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            _check_cancelled(cancel_event)
+            digest.update(chunk)
+            dst.write(chunk)
+    return digest.hexdigest()
+
+
+def _localize_member(zip_file, info, path, cached, cancel_event):
+    """Copy member from other cached scene folder or extract it.
+
+    Runs in extracting thread, members share one opened archive, reading
+    of compressed data is serialized by zipfile, decompression and writing
+    are not.
+
+    Returns:
+        tuple[dict, bool]: Manifest entry of the file and if it was copied.
+
+    """
+    _check_cancelled(cancel_event)
+    if cached and _is_file_unchanged(*cached):
+        shutil.copyfile(_long_path(cached[0]), path)
+        file_hash = cached[1]["hash"]
+        copied = True
+    else:
+        file_hash = _extract_member(zip_file, info, path, cancel_event)
+        copied = False
+    stat = os.stat(path)
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": file_hash,
+        "crc": info.CRC,
+    }
+    return entry, copied
+
+
+def get_scene_file_paths(archive_path, target, extension=".xstage"):
+    """Paths of scene files in archive extracted to `target`.
+
+    Only central directory of the archive is read, nothing on disk.
+
+    Args:
+        archive_path (str): Path to zip file.
+        target (str): Directory the archive is extracted to.
+        extension (str): Extension of scene files.
+
+    Returns:
+        list[str]: Paths of scene files in order of archive.
+
+    """
+    with _ZipFile(archive_path) as zip_file:
+        return [
+            _get_member_path(zip_file, target, info)
+            for info in zip_file.infolist()
+            if not info.is_dir()
+            and os.path.splitext(info.filename)[1] == extension
+        ]
+
+
+def extract_scene_archive(
+    archive_path,
+    target,
+    progress_callback=None,
+    cancel_event=None,
+    workers=None,
+):
+    """Update local scene folder to content of archive.
+
+    Only members which are not in the folder already are extracted.
+    Member is considered extracted when manifest of the folder has entry
+    with the same CRC and size and the local file was not modified since.
+    Members found in other cached scene folders under the same parent
+    directory (e.g. previous version of the workfile) are copied from there
+    instead of being decompressed. Files not in archive are removed.
+
+    Members are extracted by pool of threads, so localization of big scene
+    is limited by disk rather than by decompression in single thread.
+
+    Args:
+        archive_path (str): Path to zip file.
+        target (str): Path to local scene folder.
+        progress_callback (Optional[Callable[[int, int], None]]): Called
+            with number of processed bytes and total bytes.
+        cancel_event (Optional[threading.Event]): Stop extraction with
+            `ArchiveCancelled` when set.
+        workers (Optional[int]): Number of extracting threads, number of
+            CPUs is used when not set.
+
+    Returns:
+        ExtractStats: Statistics of extraction.
+
+    """
+    target = os.path.normpath(target)
+    target_root = _long_path(target)
+    manifest = _read_manifest(target) or {}
+    local_files = manifest.get("files") or {}
+    stats = ExtractStats()
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    files = {}
+    with _ZipFile(archive_path) as zip_file:
+        members = zip_file.infolist()
+        total_size = sum(info.file_size for info in members)
+        processed_size = 0
+        extracted_paths = set()
+        # Later member of the same name wins, same as in 'extractall'.
+        pending = {}
+        for info in members:
+            _check_cancelled(cancel_event)
+            path = _get_member_path(zip_file, target_root, info)
+            extracted_paths.add(os.path.normcase(path))
+            if info.is_dir():
+                os.makedirs(path, exist_ok=True)
+                continue
+
+            entry = local_files.get(info.filename)
+            if (
+                entry
+                and entry.get("crc") == info.CRC
+                and entry["size"] == info.file_size
+                and _is_file_unchanged(path, entry)
+            ):
+                files[info.filename] = entry
+                stats.unchanged_files += 1
+                processed_size += info.file_size
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                pending[path] = info
+
+        if progress_callback is not None:
+            progress_callback(processed_size, total_size)
+
+        cached_files = {}
+        if pending:
+            cached_files = _get_cached_files(os.path.dirname(target), target)
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                pool.submit(
+                    _localize_member,
+                    zip_file,
+                    info,
+                    path,
+                    cached_files.get(
+                        (info.filename, info.CRC, info.file_size)
+                    ),
+                    cancel_event,
+                ): info
+                for path, info in pending.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                info = futures[future]
+                entry, copied = future.result()
+                files[info.filename] = entry
+                if copied:
+                    stats.copied_files += 1
+                else:
+                    stats.extracted_files += 1
+                    stats.extracted_size += info.file_size
+
+                processed_size += info.file_size
+                if progress_callback is not None:
+                    progress_callback(processed_size, total_size)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # Remove files which are not part of the archive.
+    for root, _, filenames in os.walk(target_root):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if os.path.normcase(path) not in extracted_paths:
+                os.remove(path)
+
+    save_manifest(target, os.path.abspath(archive_path), files)
+    stats.elapsed_time = time.perf_counter() - start_time
+    log.info(f"Localized '{archive_path}': {stats.summary()}")
+    return stats
+
+
+class SceneDirLock:
+    """Lock of local scene folder shared by processes.
+
+    Scene folder can be extracted by launch hook in launcher process while
+    Harmony process is starting and wants to open the same scene. Lock file
+    next to the folder is created exclusively and refreshed by heartbeat
+    thread while it is held. Lock not refreshed for `stale_timeout` seconds
+    was left by dead process and is taken over.
+
+    Args:
+        scene_dir (str): Path to local scene folder.
+        stale_timeout (float): Seconds after which lock is considered stale.
+
+    """
+
+    def __init__(self, scene_dir, stale_timeout=LOCK_STALE_TIMEOUT):
+        self.path = os.path.normpath(scene_dir) + ".lock"
+        self.stale_timeout = stale_timeout
+        self._token = f"{os.getpid()}.{uuid.uuid4().hex}"
+        self._released = threading.Event()
+        self._heartbeat = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def acquire(self):
+        """Wait until lock is free and take it."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        waiting = False
+        while True:
+            try:
+                fd = os.open(
+                    self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                )
+                break
+            except FileExistsError:
+                pass
+
+            if self._is_stale(self.path):
+                self._take_over()
+                continue
+            if not waiting:
+                log.info(f"Waiting for other process using '{self.path}'.")
+                waiting = True
+            time.sleep(0.1)
+
+        with os.fdopen(fd, "w") as stream:
+            stream.write(self._token)
+
+        self._released.clear()
+        self._heartbeat = threading.Thread(
+            target=self._beat, name="SceneDirLockHeartbeat", daemon=True
+        )
+        self._heartbeat.start()
+
+    def _is_stale(self, path):
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return False
+        return age > self.stale_timeout
+
+    def _take_over(self):
+        """Remove stale lock so it can be created again.
+
+        Lock is renamed to unique name first. Other process might have
+        taken over the stale lock and created new one in the meantime, so
+        the renamed lock is checked again and put back when it is not
+        stale.
+        """
+        stale_path = f"{self.path}.{self._token}.stale"
+        try:
+            os.rename(self.path, stale_path)
+        except OSError:
+            # Renamed or released by other process.
+            return
+
+        if self._is_stale(stale_path):
+            log.warning(f"Removed stale lock '{self.path}'.")
+        else:
+            try:
+                # 'link' does not replace lock created in the meantime.
+                os.link(stale_path, self.path)
+            except OSError:
+                log.warning(f"Lock '{self.path}' was taken over twice.")
+        try:
+            os.remove(stale_path)
+        except OSError:
+            pass
+
+    def _beat(self):
+        interval = self.stale_timeout / 4.0
+        while not self._released.wait(interval):
+            self.refresh()
+
+    def refresh(self):
+        """Mark the lock as still used."""
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+
+    def release(self):
+        self._released.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        try:
+            with open(self.path) as stream:
+                owned = stream.read() == self._token
+        except OSError:
+            return
+        if not owned:
+            log.warning(f"Lock '{self.path}' is held by other process.")
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def is_locked(scene_dir):
+        return os.path.exists(os.path.normpath(scene_dir) + ".lock")
+
+
+def _is_process_alive(pid):
+    """Process with `pid` is running."""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        finally:
+            kernel32.CloseHandle(handle)
+        # STILL_ACTIVE
+        return exit_code.value == 259
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _get_open_marker_path(scene_dir, pid):
+    return f"{os.path.normpath(scene_dir)}.{pid}.open"
+
+
+def mark_scene_dir_open(scene_dir):
+    """Mark scene folder as opened by this process.
+
+    Opened folders are not evicted as long as the process is running.
+
+    Args:
+        scene_dir (str): Path to local scene folder.
+
+    """
+    marker_path = _get_open_marker_path(scene_dir, os.getpid())
+    with open(marker_path, "w"):
+        pass
+
+
+def unmark_scene_dir_open(scene_dir):
+    """Remove mark of scene folder opened by this process.
+
+    Args:
+        scene_dir (str): Path to local scene folder.
+
+    """
+    try:
+        os.remove(_get_open_marker_path(scene_dir, os.getpid()))
+    except OSError:
+        pass
+
+
+def is_scene_dir_open(scene_dir):
+    """Scene folder is opened by running process.
+
+    Marks left by processes which are not running anymore are removed.
+
+    Args:
+        scene_dir (str): Path to local scene folder.
+
+    Returns:
+        bool: Folder is opened.
+
+    """
+    prefix = os.path.normpath(scene_dir) + "."
+    for marker_path in glob.glob(glob.escape(prefix) + "*.open"):
+        pid = marker_path[len(prefix):-len(".open")]
+        if not pid.isdigit():
+            continue
+        if _is_process_alive(int(pid)):
+            return True
+        try:
+            os.remove(marker_path)
+        except OSError:
+            pass
+    return False
+
+
+def _is_scene_dir_clean(scene_dir, manifest):
+    """Local scene folder matches archive it was saved to or opened from."""
+    if load_manifest(scene_dir) is None:
+        return False
+    return all(
+        _is_file_unchanged(os.path.join(scene_dir, *name.split("/")), entry)
+        for name, entry in manifest["files"].items()
+    )
+
+
+def evict_scene_dirs(cache_root, size_limit, keep=None):
+    """Remove least recently used scene folders above size limit.
+
+    Only folders with manifest which were not modified since they were
+    saved to or opened from archive are removed, so no work is lost.
+    Folders opened by running processes are kept. Manifests of folders
+    which don't exist anymore are removed.
+
+    Args:
+        cache_root (str): Directory with cached scene folders.
+        size_limit (int): Maximum size of cached scene folders in bytes.
+        keep (Optional[Iterable[str]]): Scene folders never removed.
+
+    Returns:
+        int: Size of cached scene folders after eviction.
+
+    """
+    keep = {os.path.normpath(path) for path in keep or []}
+    scene_dirs = []
+    total_size = 0
+    for manifest_path in glob.glob(
+        os.path.join(glob.escape(cache_root), "*.manifest.json")
+    ):
+        scene_dir = manifest_path[:-len(".manifest.json")]
+        if not os.path.isdir(scene_dir):
+            # Folder may be just extracted under lock.
+            if not SceneDirLock.is_locked(scene_dir):
+                log.debug(f"Removing orphaned manifest '{manifest_path}'.")
+                remove_manifest(scene_dir)
+            continue
+        manifest = _read_manifest(scene_dir)
+        if manifest is None:
+            continue
+        size = sum(entry["size"] for entry in manifest["files"].values())
+        total_size += size
+        scene_dirs.append(
+            (manifest.get("last_used", 0), scene_dir, size, manifest)
+        )
+
+    scene_dirs.sort(key=lambda item: item[0])
+    for _, scene_dir, size, manifest in scene_dirs:
+        if total_size <= size_limit:
+            break
+        if (
+            scene_dir in keep
+            or SceneDirLock.is_locked(scene_dir)
+            or is_scene_dir_open(scene_dir)
+            or not _is_scene_dir_clean(scene_dir, manifest)
+        ):
+            continue
+        log.info(f"Removing least recently used scene '{scene_dir}'.")
+        shutil.rmtree(scene_dir, ignore_errors=True)
+        remove_manifest(scene_dir)
+        total_size -= size
+    return total_size
+
+
+class ArchiveJob:
+    """Request to archive scene folder.
+
+    Attributes:
+        source (str): Path to scene folder.
+        destination (str): Path to zip file.
+        reference (Optional[str]): Scene folder whose manifest is used
+            when `source` has none.
+        options (dict[str, Any]): Options of `write_scene_archive`.
+        future (concurrent.futures.Future): Resolved with `destination`
+            when archive is moved to destination.
+        reported_percent (int): Last progress reported for the job.
+
+    """
+
+    def __init__(self, source, destination, reference=None, options=None):
+        self.source = os.path.normpath(source)
+        self.destination = destination
+        self.reference = reference
+        self.options = options or {}
+        self.future = concurrent.futures.Future()
+        self.cancel_event = threading.Event()
+        self.reported_percent = -1
+
+    def cancel(self):
+        """Cancel the job, running job stops as soon as possible."""
+        self.cancel_event.set()
+        self.future.cancel()
+
+
+class ArchiveQueue(threading.Thread):
+    """Background thread archiving scene folders one after another.
+
+    Args:
+        progress_callback (Optional[Callable[[ArchiveJob, int, int], None]]):
+            Called with job, number of processed bytes and total bytes.
+
+    """
+
+    def __init__(self, progress_callback=None):
+        super(ArchiveQueue, self).__init__()
+        self.daemon = True
+        self.progress_callback = progress_callback
+        self._condition = threading.Condition()
+        self._pending = collections.OrderedDict()
+        self._running = None
+        self._stopped = False
+
+    def submit(self, source, destination, reference=None, **options):
+        """Queue archiving of scene folder.
+
+        Pending job of the same folder is replaced and running one is
+        cancelled.
+
+        Args:
+            source (str): Path to scene folder.
+            destination (str): Path to zip file.
+            reference (Optional[str]): Scene folder whose manifest is used
+                when `source` has none.
+            **options: Options of `write_scene_archive`.
+
+        Returns:
+            ArchiveJob: Queued job.
+
+        """
+        job = ArchiveJob(source, destination, reference, options)
+        with self._condition:
+            self._cancel(job.source)
+            self._pending[job.source] = job
+            self._condition.notify_all()
+        return job
+
+    def cancel(self, source, wait=True):
+        """Cancel pending and running archiving of scene folder.
+
+        Args:
+            source (str): Path to scene folder.
+            wait (bool): Wait until running job stops, so the folder can
+                be modified.
+
+        Returns:
+            list[ArchiveJob]: Cancelled jobs.
+
+        """
+        source = os.path.normpath(source)
+        with self._condition:
+            cancelled = self._cancel(source)
+            running = self._running
+            if wait and running is not None and running.source == source:
+                while self._running is running:
+                    self._condition.wait()
+        return cancelled
+
+    def _cancel(self, source):
+        cancelled = []
+        pending = self._pending.pop(source, None)
+        if pending is not None:
+            pending.cancel()
+            cancelled.append(pending)
+        running = self._running
+        if running is not None and running.source == source:
+            running.cancel()
+            cancelled.append(running)
+        for job in cancelled:
+            log.debug(f"Cancelled archiving of '{job.source}'.")
+        return cancelled
+
+    def wait(self, timeout=None, source=None):
+        """Wait until all queued jobs are processed.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait.
+            source (Optional[str]): Wait only for jobs of this scene folder.
+
+        Returns:
+            bool: False if timed out.
+
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self.is_busy(source), timeout
+            )
+
+    def is_busy(self, source=None):
+        """Scene folder is queued or being archived.
+
+        Args:
+            source (Optional[str]): Scene folder, any job when not passed.
+
+        Returns:
+            bool: Job is pending or running.
+
+        """
+        with self._condition:
+            if source is None:
+                return bool(self._pending) or self._running is not None
+            source = os.path.normpath(source)
+            running = self._running
+            return source in self._pending or (
+                running is not None and running.source == source
+            )
+
+    def stop(self):
+        """Stop the thread once queued jobs are processed."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending or self._stopped
+                )
+                if not self._pending:
+                    return
+                _, job = self._pending.popitem(last=False)
+                self._running = job
+
+            try:
+                self._process(job)
+            finally:
+                with self._condition:
+                    self._running = None
+                    self._condition.notify_all()
+
+    def _process(self, job):
+        if not job.future.set_running_or_notify_cancel():
+            return
+
+        def progress(processed_size, total_size):
+            if self.progress_callback is not None:
+                self.progress_callback(job, processed_size, total_size)
+
+        try:
+            archive_scene(
+                job.source,
+                job.destination,
+                job.reference,
+                progress,
+                job.cancel_event,
+                **job.options
+            )
+        except ArchiveCancelled as exc:
+            job.future.set_exception(exc)
+        except Exception as exc:
+            log.error(
+                f"Archiving of '{job.source}' failed.", exc_info=True)
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(job.destination)
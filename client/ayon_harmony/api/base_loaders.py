@@ -78,10 +78,12 @@ class BackdropBaseLoader(load.LoaderPlugin):
         )["result"]
 
         # Replace template container
-        self.remove(container)  # Before load to avoid node name incrementation
-        container = self.load(
-            context, container["name"], container["namespace"]
-        )
+        with harmony.deferred_scene_data_flush():
+            # Before load to avoid node name incrementation
+            self.remove(container)
+            container = self.load(
+                context, container["name"], container["namespace"]
+            )
 
         # Restore backdrop links
         harmony.send(
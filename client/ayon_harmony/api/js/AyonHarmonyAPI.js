@@ -32,10 +32,14 @@ AyonHarmonyAPI.getSceneData = function() {
 
 /**
  * Set scene metadata to Harmony.
+ *
+ * Revision of scene metadata is incremented with each change.
  * @function
  * @param {object} metadata Object containing metadata.
+ * @return {int} New revision of scene metadata.
  */
 AyonHarmonyAPI.setSceneData = function(metadata) {
+    var revision = AyonHarmonyAPI.getSceneDataRevision() + 1;
     scene.setMetadata({
         'name'       : 'ayon',
         'type'       : 'string',
@@ -43,6 +47,80 @@ AyonHarmonyAPI.setSceneData = function(metadata) {
         'version'    : '1.0',
         'value'      : JSON.stringify(metadata)
     });
+    scene.setMetadata({
+        'name'       : 'ayonRevision',
+        'type'       : 'string',
+        'creator'    : 'AYON',
+        'version'    : '1.0',
+        'value'      : revision.toString()
+    });
+    return revision;
+};
+
+
+/**
+ * Get revision of scene metadata.
+ *
+ * Revision is a counter stored in its own scene metadata attribute, it is
+ * incremented by `setSceneData` and `patchSceneData`, and follows undo/redo
+ * of scene metadata.
+ * @function
+ * @return {int} Revision of scene metadata, 0 if not set.
+ */
+AyonHarmonyAPI.getSceneDataRevision = function() {
+    var revision = scene.metadata('ayonRevision');
+    if (!revision) {
+        return 0;
+    }
+    return parseInt(revision.value, 10) || 0;
+};
+
+
+/**
+ * Update only specified keys of scene metadata.
+ * @function
+ * @param {array} args Object with keys to set and array of keys to delete.
+ * @return {array} Revisions of scene metadata before and after the update.
+ *
+ * @example
+ * // arguments are in following order:
+ * var args = [
+ *  upserts,
+ *  deletes
+ * ];
+ */
+AyonHarmonyAPI.patchSceneData = function(args) {
+    var upserts = args[0] || {};
+    var deletes = args[1] || [];
+    var metadata = AyonHarmonyAPI.getSceneData();
+    for (var key in upserts) {
+        if (upserts.hasOwnProperty(key)) {
+            metadata[key] = upserts[key];
+        }
+    }
+    for (var i = 0; i < deletes.length; i++) {
+        delete metadata[deletes[i]];
+    }
+    var revision = AyonHarmonyAPI.setSceneData(metadata);
+    return [revision - 1, revision];
+};
+
+
+/**
+ * Get only specified keys of scene metadata.
+ * @function
+ * @param {array} keys Keys to get.
+ * @return {object} Scene metadata of existing keys.
+ */
+AyonHarmonyAPI.getSceneDataKeys = function(keys) {
+    var metadata = AyonHarmonyAPI.getSceneData();
+    var result = {};
+    for (var i = 0; i < keys.length; i++) {
+        if (metadata.hasOwnProperty(keys[i])) {
+            result[keys[i]] = metadata[keys[i]];
+        }
+    }
+    return result;
 };
 
 
@@ -191,6 +269,25 @@ AyonHarmonyAPI.addPathToWatcher = function(path) {
 };
 
 
+/**
+ * Report progress of saving workfile running in background.
+ * @function
+ * @param {array} args  Workfile path, progress in percents and status
+ *                      ('progress', 'done' or 'failed').
+ */
+AyonHarmonyAPI.reportSaveProgress = function(args) {
+    var path = args[0];
+    var percent = args[1];
+    var status = args[2];
+    if (status === 'failed') {
+        MessageBox.information('Saving of ' + path + ' failed.');
+        return;
+    }
+    var label = status === 'done' ? 'saved' : 'saving ' + percent + '%';
+    MessageLog.trace('AYON: Workfile ' + path + ' ' + label);
+};
+
+
 /**
  * Setup node for Creator.
  * @function
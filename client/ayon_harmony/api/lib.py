@@ -6,22 +6,26 @@ import subprocess
 import threading
 import os
 import random
-import zipfile
 import sys
 import filecmp
 import shutil
 import logging
 import contextlib
+import copy
 import json
 import signal
+import zipfile
 import time
 from uuid import uuid4
 import collections
+import concurrent.futures
 from typing import Optional
 
 from qtpy import QtWidgets, QtCore, QtGui
 
 from ayon_core.lib import is_using_ayon_console, env_value_to_bool
+from ayon_core.settings import get_project_settings
+from ayon_core.pipeline import get_current_project_name
 from ayon_core.tools.stdout_broker import StdOutBroker
 from ayon_core.tools.utils import host_tools
 from ayon_core import style
@@ -29,34 +33,137 @@ from ayon_core import style
 from ayon_harmony import HARMONY_ADDON_ROOT
 
 from .server import Server
+from . import archive
 
 # Setup logging.
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
 
+class MainThreadDispatcher(QtCore.QObject):
+    """Execute callbacks queued from any thread in the main thread.
+
+    Queueing a callback emits `wakeup` signal which is delivered through
+    Qt event loop of the main thread (queued connection). On each wakeup
+    all pending callbacks are executed unless `time_budget` is exceeded,
+    in that case remaining callbacks are dispatched on next wakeup so the
+    UI stays responsive.
+
+    Attributes:
+        time_budget (float): Seconds callbacks may take per wakeup.
+        latencies (collections.deque): Seconds recent callbacks waited in
+            the queue.
+
+    """
+    wakeup = QtCore.Signal()
+
+    time_budget = 0.05
+
+    def __init__(self, callback_queue):
+        super().__init__()
+        self._callback_queue = callback_queue
+        self.latencies = collections.deque(maxlen=1000)
+        self.wakeup.connect(self._dispatch, QtCore.Qt.QueuedConnection)
+
+    def _dispatch(self):
+        deadline = time.perf_counter() + self.time_budget
+        # Callbacks queued during dispatching wait for their own wakeup.
+        for _ in range(len(self._callback_queue)):
+            if time.perf_counter() > deadline:
+                self.wakeup.emit()
+                return
+            queued_time, callback = self._callback_queue.popleft()
+            self.latencies.append(time.perf_counter() - queued_time)
+            try:
+                callback()
+            except Exception:
+                log.error("Main thread callback failed.", exc_info=True)
+
+    def latency_stats(self):
+        """Statistics of time callbacks waited in the queue.
+
+        Returns:
+            dict[str, float]: Count and p50/p95/max latency in milliseconds.
+
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        def percentile(percent):
+            index = round(percent / 100 * (len(latencies) - 1))
+            return latencies[index] * 1000
+
+        return {
+            "count": len(latencies),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "max_ms": latencies[-1] * 1000,
+        }
+
+
 class ProcessContext:
     server = None
     pid = None
     process = None
     application_path = None
     callback_queue = collections.deque()
+    dispatcher = None
+    archive_queue = None
     workfile_path = None
+    # Local scene folder opened in Harmony.
+    scene_dir = None
     port = None
     stdout_broker = None
     workfile_tool = None
+    # Time when each tool was requested to show last time.
+    tool_requests = {}
+    # Repeated requests for the same tool in this window (seconds) are
+    #   ignored.
+    tool_request_window = 0.5
 
     @classmethod
     def execute_in_main_thread(cls, func_to_call_from_main_thread):
-        cls.callback_queue.append(func_to_call_from_main_thread)
+        """Queue callable to be executed in the main thread.
+
+        Args:
+            func_to_call_from_main_thread (Callable): Callable without
+                arguments.
+
+        Returns:
+            concurrent.futures.Future: Future resolved with return value
+                of the callable or with exception it raised.
+
+        """
+        future = concurrent.futures.Future()
+
+        def callback():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = func_to_call_from_main_thread()
+            except Exception as exc:
+                log.error("Main thread callback failed.", exc_info=True)
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+        cls.callback_queue.append((time.perf_counter(), callback))
+        if cls.dispatcher is not None:
+            cls.dispatcher.wakeup.emit()
+        return future
 
     @classmethod
     def main_thread_listen(cls):
-        if cls.callback_queue:
-            callback = cls.callback_queue.popleft()
-            callback()
         if cls.process is not None and cls.process.poll() is not None:
             log.info("Server is not running, closing")
+            if cls.archive_queue is not None:
+                # Harmony is gone, nothing to report progress to.
+                cls.archive_queue.progress_callback = None
+                if not cls.archive_queue.wait(0):
+                    log.info("Waiting for workfile to be saved.")
+                wait_for_zip_and_move()
+            _set_open_scene_dir(None)
             ProcessContext.stdout_broker.stop()
             QtWidgets.QApplication.quit()
 
@@ -73,18 +180,6 @@ def signature(postfix="func") -> str:
     return "f{}_{}".format(str(uuid4()).replace("-", "_"), postfix)
 
 
-class _ZipFile(zipfile.ZipFile):
-    """Extended check for windows invalid characters."""
-
-    # this is extending default zipfile table for few invalid characters
-    # that can come from Mac
-    _windows_illegal_characters = ":<>|\"?*\r\n\x00"
-    _windows_illegal_name_trans_table = str.maketrans(
-        _windows_illegal_characters,
-        "_" * len(_windows_illegal_characters)
-    )
-
-
 def main(*subprocess_args):
     # coloring in StdOutBroker
     os.environ["AYON_LOG_NO_COLORS"] = "0"
@@ -93,12 +188,16 @@ def main(*subprocess_args):
     icon = QtGui.QIcon(style.get_app_icon_path())
     app.setWindowIcon(icon)
 
+    ProcessContext.dispatcher = MainThreadDispatcher(
+        ProcessContext.callback_queue
+    )
     ProcessContext.stdout_broker = StdOutBroker('harmony')
     ProcessContext.stdout_broker.start()
     launch(*subprocess_args)
 
+    # Callbacks are dispatched on wakeup, timer only watches Harmony process.
     loop_timer = QtCore.QTimer()
-    loop_timer.setInterval(20)
+    loop_timer.setInterval(500)
 
     loop_timer.timeout.connect(ProcessContext.main_thread_listen)
     loop_timer.start()
@@ -219,7 +318,9 @@ def launch(application_path, *args):
 
 def check_workfiles_tool():
     if ProcessContext.workfile_tool.isVisible():
-        ProcessContext.execute_in_main_thread(check_workfiles_tool)
+        # Check again later, re-queueing right away would keep main thread
+        #   busy while the tool is opened.
+        QtCore.QTimer.singleShot(200, check_workfiles_tool)
     elif not ProcessContext.workfile_path:
         open_empty_workfile()
 
@@ -245,6 +346,120 @@ def get_local_harmony_path(filepath):
     return os.path.join(harmony_path, basename)
 
 
+class _ExtractProgress:
+    """Print progress of workfile localization every 10 percents.
+
+    Harmony is not running yet while its scene is extracted, so progress
+    goes to console.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.reported_percent = -1
+
+    def __call__(self, processed_size, total_size):
+        percent = 100
+        if total_size:
+            percent = int(processed_size * 100 / total_size)
+        if percent // 10 <= self.reported_percent // 10:
+            return
+        self.reported_percent = percent
+        print(f"Localizing {self.filepath}: {percent}%")
+
+
+def localize_scene_file(filepath, project_settings=None):
+    """Extract zip file to local scene folder unless local one is newer.
+
+    Other process localizing the same scene folder (e.g. pre-warm started
+    by launch hook) is waited for.
+
+    Args:
+        filepath (str): Path to the zip file.
+        project_settings (Optional[dict]): Project settings, settings of
+            current project are used when not passed.
+
+    Returns:
+        str: Path to local scene folder.
+
+    Raises:
+        Exception: If the working folder cannot be localized.
+
+    """
+    extract_dir_path = get_local_harmony_path(filepath)
+    scene_name = os.path.basename(extract_dir_path)
+    with archive.SceneDirLock(extract_dir_path):
+        local_scene_dir_path = extract_dir_path
+        if os.path.exists(os.path.join(local_scene_dir_path, scene_name)):
+            # unzipped with duplicated scene_name
+            local_scene_dir_path = os.path.join(
+                local_scene_dir_path, scene_name
+            )
+
+        scene_path = os.path.join(
+            local_scene_dir_path, f"{scene_name}.xstage"
+        )
+        if (
+            os.path.exists(scene_path)
+            and os.path.getmtime(scene_path) >= os.path.getmtime(filepath)
+        ):
+            # Local scene is newer than remote.
+            archive.touch_manifest(extract_dir_path)
+            return local_scene_dir_path
+
+        # Only files which differ from local scene folder are extracted.
+        workfile_settings = _get_workfile_settings(project_settings)
+        try:
+            archive.extract_scene_archive(
+                filepath,
+                extract_dir_path,
+                progress_callback=_ExtractProgress(filepath),
+                workers=workfile_settings.get("extract_workers") or None,
+            )
+        except Exception as e:
+            log.error(e)
+            raise Exception("Cannot localize working folder") from e
+
+    size_limit = workfile_settings.get("local_cache_size_limit")
+    if size_limit:
+        archive.evict_scene_dirs(
+            os.path.dirname(extract_dir_path),
+            size_limit * 1024 ** 3,
+            keep=[extract_dir_path],
+        )
+
+    if os.path.exists(os.path.join(extract_dir_path, scene_name)):
+        # unzipped with duplicated scene_name
+        return os.path.join(extract_dir_path, scene_name)
+    return extract_dir_path
+
+
+def prewarm_local_scene(filepath, project_settings=None):
+    """Start localizing zip file in background thread.
+
+    Used by launch hook, so scene is extracted while Harmony launch script
+    starts. `unzip_scene_file` in Harmony launch waits until it finishes.
+
+    Args:
+        filepath (str): Path to the zip file.
+        project_settings (Optional[dict]): Project settings.
+
+    Returns:
+        threading.Thread: Started thread.
+
+    """
+    def _localize():
+        try:
+            localize_scene_file(filepath, project_settings)
+        except Exception:
+            log.warning(f"Pre-warm of '{filepath}' failed.", exc_info=True)
+
+    # Not a daemon, process launching Harmony must not leave scene folder
+    #   half extracted when it exits.
+    thread = threading.Thread(target=_localize, name="HarmonyPrewarm")
+    thread.start()
+    return thread
+
+
 def unzip_scene_file(filepath: str) -> str:
     """Unzip a Harmony scene file and return the path to the .xstage file.
 
@@ -261,49 +476,22 @@ def unzip_scene_file(filepath: str) -> str:
     """
     print(f"Localizing {filepath}")
 
-    local_scene_dir_path = get_local_harmony_path(filepath)
-    scene_name = os.path.basename(local_scene_dir_path)
-    if os.path.exists(os.path.join(local_scene_dir_path, scene_name)):
-        # unzipped with duplicated scene_name
-        local_scene_dir_path = os.path.join(local_scene_dir_path, scene_name)
-
+    local_scene_dir_path = localize_scene_file(filepath)
+    extract_dir_path = get_local_harmony_path(filepath)
+    scene_name = os.path.basename(extract_dir_path)
     scene_path = os.path.join(
         local_scene_dir_path, f"{scene_name}.xstage"
     )
 
-    unzip = True
-    if os.path.exists(scene_path):
-        unzip = False
-        # Check remote scene is newer than local.
-        if os.path.getmtime(scene_path) < os.path.getmtime(filepath):
-            try:
-                shutil.rmtree(local_scene_dir_path)
-            except Exception as e:
-                log.error(e)
-                raise Exception("Cannot delete working folder") from e
-            unzip = True
-
-    if unzip:
-        with _ZipFile(filepath, "r") as zip_ref:
-            zip_ref.extractall(local_scene_dir_path)
-
-        if os.path.exists(os.path.join(local_scene_dir_path, scene_name)):
-            # unzipped with duplicated scene_name
-            local_scene_dir_path = os.path.join(
-                local_scene_dir_path, scene_name
-            )
-
-    # find any xstage files is directory, prefer the one with the same name
-    # as directory (plus extension)
-    xstage_files = []
-    for root, _, files in os.walk(local_scene_dir_path):
-        for file in files:
-            if os.path.splitext(file)[1] == ".xstage":
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(
-                    full_path, local_scene_dir_path
-                )
-                xstage_files.append(relative_path)
+    # find any xstage files in central directory of zip file, prefer
+    # the one with the same name as directory (plus extension)
+    try:
+        xstage_files = archive.get_scene_file_paths(
+            filepath, extract_dir_path
+        )
+    except (OSError, zipfile.BadZipFile) as e:
+        log.error(e)
+        raise Exception("Cannot read workfile") from e
 
     if not os.path.basename("temp.zip"):
         if not xstage_files:
@@ -314,11 +502,9 @@ def unzip_scene_file(filepath: str) -> str:
         os.path.splitext(os.path.basename(filepath))[0])
 
     xstage_files.reverse()  # prefer 0 found xstage
-    for relative_path_xstage in xstage_files:
-        scene_path = os.path.join(
-            local_scene_dir_path, relative_path_xstage
-        )
-        if zip_based_name in relative_path_xstage:
+    for xstage_path in xstage_files:
+        scene_path = xstage_path
+        if zip_based_name in os.path.basename(xstage_path):
             break
 
     if not os.path.exists(scene_path):
@@ -329,12 +515,24 @@ def unzip_scene_file(filepath: str) -> str:
     return scene_path
 
 
+def _set_open_scene_dir(scene_dir):
+    """Protect local scene folder opened in Harmony from eviction."""
+    if ProcessContext.scene_dir:
+        archive.unmark_scene_dir_open(ProcessContext.scene_dir)
+    ProcessContext.scene_dir = scene_dir
+    if scene_dir:
+        archive.mark_scene_dir_open(scene_dir)
+
+
 def launch_zip_file(filepath):
     """Launch a Harmony application instance with the provided zip file.
 
     Args:
         filepath (str): Path to file.
     """
+    # Workfile may be still archived in background.
+    wait_for_zip_and_move()
+
     # Close existing scene.
     if ProcessContext.pid:
         os.kill(ProcessContext.pid, signal.SIGTERM)
@@ -352,6 +550,7 @@ def launch_zip_file(filepath):
 
     # Save workfile path for later.
     ProcessContext.workfile_path = filepath
+    invalidate_scene_data()
 
     # Unzip the scene file and get the .xstage path
     try:
@@ -361,6 +560,8 @@ def launch_zip_file(filepath):
         ProcessContext.server.stop()
         return
 
+    _set_open_scene_dir(get_local_harmony_path(filepath))
+
     print("Launching {}".format(scene_path))
     # QUESTION Could we use 'run_detached_process' from 'ayon_core.lib'?
     kwargs = {}
@@ -383,41 +584,213 @@ def launch_zip_file(filepath):
     ProcessContext.stdout_broker.host_connected()
 
 
-def on_file_changed(path, threaded=True):
-    """Threaded zipping and move of the project directory.
+def _get_workfile_settings(project_settings=None):
+    if project_settings is None:
+        project_name = get_current_project_name()
+        if not project_name:
+            return {}
+        project_settings = get_project_settings(project_name)
+    return project_settings["harmony"].get("workfile") or {}
 
-    This method is called when the `.xstage` file is changed.
-    """
-    log.debug("File changed: " + path)
 
-    if ProcessContext.workfile_path is None:
-        return
+def get_archive_options(project_settings=None):
+    """Get options of zipping scene folders from project settings.
 
-    if threaded:
-        thread = threading.Thread(
-            target=zip_and_move,
-            args=(os.path.dirname(path), ProcessContext.workfile_path)
+    Args:
+        project_settings (Optional[dict]): Project settings, settings of
+            current project are used when not passed.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for
+            `archive.write_scene_archive`.
+
+    """
+    workfile_settings = _get_workfile_settings(project_settings)
+    options = {}
+    if "compression_level" in workfile_settings:
+        options["compression_level"] = workfile_settings["compression_level"]
+    if workfile_settings.get("compression_workers"):
+        options["workers"] = workfile_settings["compression_workers"]
+    if "store_extensions" in workfile_settings:
+        options["policy"] = archive.CompressionPolicy(
+            workfile_settings["store_extensions"],
+            workfile_settings.get("detect_incompressible", True),
         )
-        thread.start()
-    else:
-        zip_and_move(os.path.dirname(path), ProcessContext.workfile_path)
+    if workfile_settings.get("paranoid_verification"):
+        options["paranoid"] = True
+    return options
 
 
-def zip_and_move(source, destination):
+def zip_and_move(source, destination, reference=None):
     """Zip a directory and move to `destination`.
 
+    Archive is updated incrementally, files not changed since previous
+    save of `source` are copied from previous archive without being
+    compressed again.
+
+    Args:
+        source (str): Directory to zip and move to destination.
+        destination (str): Destination file path to zip file.
+        reference (Optional[str]): Directory whose last archive is used
+            when `source` was not archived yet, e.g. scene folder of
+            previous version of the workfile.
+
+    """
+    archive.archive_scene(
+        source, destination, reference, **get_archive_options()
+    )
+
+
+def zip_directory(source, zip_path, project_settings=None):
+    """Zip content of a directory using all CPUs.
+
+    Args:
+        source (str): Directory to zip.
+        zip_path (str): Path to zip file to create.
+        project_settings (Optional[dict]): Project settings with archive
+            options, settings of current project are used when not passed.
+
+    Returns:
+        archive.ArchiveStats: Statistics of created zip file.
+
+    """
+    stats = archive.ArchiveStats()
+    archive.write_scene_archive(
+        source,
+        zip_path,
+        stats=stats,
+        **get_archive_options(project_settings)
+    )
+    return stats
+
+
+def get_archive_queue():
+    """Get background queue archiving scene folders, start it if needed.
+
+    Returns:
+        archive.ArchiveQueue: Running queue.
+
+    """
+    if ProcessContext.archive_queue is None:
+        ProcessContext.archive_queue = archive.ArchiveQueue(
+            progress_callback=_report_save_progress
+        )
+        ProcessContext.archive_queue.start()
+    return ProcessContext.archive_queue
+
+
+def zip_and_move_in_background(source, destination, reference=None):
+    """Zip a directory and move it to `destination` in background.
+
+    Pending or running archiving of the same directory is cancelled, only
+    the newest save is archived. Progress is reported to Harmony.
+
     Args:
         source (str): Directory to zip and move to destination.
         destination (str): Destination file path to zip file.
+        reference (Optional[str]): Directory whose last archive is used
+            when `source` was not archived yet.
+
+    Returns:
+        archive.ArchiveJob: Queued job, its `future` is resolved once
+            the zip file is in destination.
+
+    """
+    job = get_archive_queue().submit(
+        source, destination, reference, **get_archive_options()
+    )
+    job.future.add_done_callback(
+        lambda future: _report_save_result(job, future)
+    )
+    return job
+
+
+def cancel_zip_and_move(source):
+    """Stop archiving of directory before it is modified.
+
+    Args:
+        source (str): Directory being archived.
+
+    Returns:
+        list[archive.ArchiveJob]: Cancelled jobs.
+
+    """
+    if ProcessContext.archive_queue is None:
+        return []
+    return ProcessContext.archive_queue.cancel(source)
+
+
+def wait_for_zip_and_move(timeout=None, source=None):
+    """Wait until all workfiles are archived.
+
+    Args:
+        timeout (Optional[float]): Maximum seconds to wait.
+        source (Optional[str]): Wait only until this directory is archived,
+            e.g. before it is removed.
+
+    Returns:
+        bool: False if timed out.
+
+    """
+    if ProcessContext.archive_queue is None:
+        return True
+    return ProcessContext.archive_queue.wait(timeout, source)
+
+
+def _send_save_progress(destination, percent, status):
+    server = ProcessContext.server
+    if server is None or server.closed or server.connection is None:
+        return
+    # Archiving must not wait for Harmony, reply is not awaited.
+    try:
+        server.notify({
+            "function": "AyonHarmonyAPI.reportSaveProgress",
+            "args": [destination, percent, status]
+        })
+    except Exception:
+        log.debug("Failed to report save progress.", exc_info=True)
+
+
+def _report_save_progress(job, processed_size, total_size):
+    percent = 100
+    if total_size:
+        percent = int(processed_size * 100 / total_size)
+    # Report only every 10 percents to not flood Harmony with messages.
+    if percent // 10 <= job.reported_percent // 10:
+        return
+    job.reported_percent = percent
+    _send_save_progress(job.destination, percent, "progress")
+
+
+def _report_save_result(job, future):
+    process = ProcessContext.process
+    if future.cancelled() or (
+        process is not None and process.poll() is not None
+    ):
+        return
+    exc = future.exception()
+    if isinstance(exc, archive.ArchiveCancelled):
+        return
+    status = "failed" if exc is not None else "done"
+    _send_save_progress(job.destination, 100, status)
+
 
+def on_file_changed(path, threaded=True):
+    """Zipping and move of the project directory.
+
+    This method is called when the `.xstage` file is changed.
     """
-    os.chdir(os.path.dirname(source))
-    shutil.make_archive(os.path.basename(source), "zip", source)
-    with _ZipFile(os.path.basename(source) + ".zip") as zr:
-        if zr.testzip() is not None:
-            raise Exception("File archive is corrupted.")
-    shutil.move(os.path.basename(source) + ".zip", destination)
-    log.debug(f"Saved '{source}' to '{destination}'")
+    log.debug("File changed: " + path)
+
+    if ProcessContext.workfile_path is None:
+        return
+
+    if threaded:
+        zip_and_move_in_background(
+            os.path.dirname(path), ProcessContext.workfile_path
+        )
+    else:
+        zip_and_move(os.path.dirname(path), ProcessContext.workfile_path)
 
 
 def show(tool_name):
@@ -430,9 +803,19 @@ def show(tool_name):
         module_name (str): Name of module to call "show" on.
 
     """
-    # Requests often get doubled up when showing tools, so we wait a second
-    #   for requests to be received properly.
-    time.sleep(1)
+    # Requests often get doubled up when showing tools, show the tool only
+    #   once for requests received in short succession.
+    now = time.monotonic()
+    last_request = ProcessContext.tool_requests.get(tool_name)
+    if (
+        last_request is not None
+        and now - last_request < ProcessContext.tool_request_window
+    ):
+        log.debug(f"Ignoring repeated request to show '{tool_name}'.")
+        return
+    # Window starts when the tool is shown, so a stream of repeated
+    #   requests cannot keep suppressing the tool.
+    ProcessContext.tool_requests[tool_name] = now
 
     kwargs = {}
     if tool_name == "loader":
@@ -451,33 +834,322 @@ def show(tool_name):
     return "nothing"
 
 
-def get_scene_data():
+class SceneDataCache:
+    """Python side cache of the `ayon` scene metadata.
+
+    Scene metadata are fetched from Harmony once and kept together with
+    revision of metadata in Harmony they match. Revision is a counter stored
+    next to metadata in Harmony, incremented with each write. Before cached
+    metadata are used the revision is compared with the current one in
+    Harmony, so changes made by undo/redo are fetched again. Inside
+    :func:`deferred_scene_data_flush` context the revision is checked only
+    once.
+
+    Changes are tracked by top level keys and written back to Harmony on
+    flush. Flush happens right after each change unless it is deferred by
+    :func:`deferred_scene_data_flush` context, then all changes are written
+    back with one request at the end of the context.
+
+    `lock` guards cached values and is never held while a request is sent
+    to Harmony, requests of the cache are serialized by `send_lock`.
+
+    Attributes:
+        data (Optional[dict]): Cached scene metadata, None if not fetched.
+        harmony_revision (Optional[int]): Revision of metadata in Harmony
+            cached metadata match.
+        revision (int): Incremented with each change of cached metadata.
+        flushed_revision (int): Revision last written to Harmony.
+        generation (int): Incremented when cached metadata are dropped.
+        dirty_keys (set[str]): Keys changed since last flush.
+        defer_depth (int): Depth of nested deferred flush contexts.
+        validated (bool): Revision was checked in current deferred flush
+            context.
+
+    """
+    data = None
+    harmony_revision = None
+    revision = 0
+    flushed_revision = 0
+    generation = 0
+    dirty_keys = set()
+    defer_depth = 0
+    validated = False
+    lock = threading.RLock()
+    send_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Return cached scene metadata valid for current state of Harmony.
+
+        Metadata are fetched when not cached yet or when they were changed
+        in Harmony.
+        """
+        with cls.send_lock:
+            while True:
+                with cls.lock:
+                    data = cls.data
+                    generation = cls.generation
+                    known_revision = cls.harmony_revision
+                    # Not flushed changes would be lost by fetch.
+                    if data is not None and (
+                        cls.dirty_keys
+                        or (cls.defer_depth and cls.validated)
+                    ):
+                        return data
+
+                if (
+                    data is not None
+                    and _fetch_scene_data_revision() == known_revision
+                ):
+                    with cls.lock:
+                        if cls.generation != generation:
+                            continue
+                        cls.validated = cls.defer_depth > 0
+                        return data
+
+                data, harmony_revision = _fetch_scene_data()
+                with cls.lock:
+                    if cls.generation != generation:
+                        continue
+                    cls.data = data
+                    cls.harmony_revision = harmony_revision
+                    cls.dirty_keys = set()
+                    cls.validated = cls.defer_depth > 0
+                    return data
+
+    @classmethod
+    def mark_dirty(cls, keys):
+        """Mark keys as changed and flush if flush is not deferred.
+
+        Args:
+            keys (Iterable[str]): Changed top level keys.
+
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        with cls.lock:
+            cls.dirty_keys |= keys
+            cls.revision += 1
+            deferred = cls.defer_depth > 0
+        if not deferred:
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """Write changed scene metadata back to Harmony."""
+        with cls.send_lock:
+            with cls.lock:
+                if cls.data is None or not cls.dirty_keys:
+                    return
+                dirty_keys = cls.dirty_keys
+                upserts = copy.deepcopy({
+                    key: cls.data[key]
+                    for key in dirty_keys
+                    if key in cls.data
+                })
+                deletes = [key for key in dirty_keys if key not in cls.data]
+                cls.dirty_keys = set()
+                revision = cls.revision
+                generation = cls.generation
+                known_revision = cls.harmony_revision
+
+            try:
+                previous_revision, harmony_revision = patch_scene_data(
+                    upserts, deletes
+                )
+            except Exception:
+                with cls.lock:
+                    if cls.generation == generation:
+                        cls.dirty_keys |= dirty_keys
+                raise
+
+            with cls.lock:
+                if cls.generation != generation:
+                    return
+                cls.flushed_revision = revision
+                if previous_revision == known_revision:
+                    cls.harmony_revision = harmony_revision
+                elif not cls.dirty_keys:
+                    # Metadata were changed in Harmony meanwhile, cached
+                    #   metadata don't contain those changes.
+                    cls._drop()
+                else:
+                    # Fetch again once remaining changes are flushed.
+                    cls.harmony_revision = None
+
+    @classmethod
+    def invalidate(cls):
+        """Drop cached scene metadata including not flushed changes."""
+        with cls.lock:
+            if cls.dirty_keys:
+                log.warning(
+                    "Dropping not flushed scene data changes of keys: "
+                    f"{', '.join(sorted(cls.dirty_keys))}"
+                )
+            cls._drop()
+            cls.revision += 1
+            cls.flushed_revision = cls.revision
+
+    @classmethod
+    def _drop(cls):
+        cls.data = None
+        cls.harmony_revision = None
+        cls.dirty_keys = set()
+        cls.validated = False
+        cls.generation += 1
+
+
+def _fetch_scene_data():
+    """Fetch scene metadata with their revision from Harmony.
+
+    Returns:
+        tuple[dict, int]: Scene metadata and their revision.
+
+    """
     try:
-        return send(
-            {
-                "function": "AyonHarmonyAPI.getSceneData"
-            })["result"]
+        data, harmony_revision = send_batch([
+            {"function": "AyonHarmonyAPI.getSceneData"},
+            {"function": "AyonHarmonyAPI.getSceneDataRevision"},
+        ])
     except json.decoder.JSONDecodeError:
         # Means no scene metadata has been made before.
-        return {}
+        return {}, None
     except KeyError:
         # Means no existing scene metadata has been made.
-        return {}
+        return {}, None
+    return data or {}, harmony_revision
+
+
+def _fetch_scene_data_revision():
+    try:
+        return send(
+            {
+                "function": "AyonHarmonyAPI.getSceneDataRevision"
+            })["result"]
+    except KeyError:
+        return None
+
+
+def get_scene_data():
+    """Get scene metadata.
+
+    Metadata are served from :class:`SceneDataCache`, modifications of
+    returned dictionary are not stored until passed to `set_scene_data`.
+
+    Returns:
+        dict: Scene metadata.
+
+    """
+    scene_data = SceneDataCache.get()
+    with SceneDataCache.lock:
+        return copy.deepcopy(scene_data)
 
 
 def set_scene_data(data):
     """Write scene data to metadata.
 
+    Only changed keys are marked dirty, when nothing has changed no request
+    is sent to Harmony.
+
     Args:
         data (dict): Data to write.
 
     """
-    # Write scene data.
-    send(
+    while True:
+        scene_data = SceneDataCache.get()
+        with SceneDataCache.lock:
+            if SceneDataCache.data is not scene_data:
+                # Dropped while it was validated, try again.
+                continue
+            changed_keys = {
+                key
+                for key in set(scene_data) | set(data)
+                if key not in scene_data
+                or key not in data
+                or scene_data[key] != data[key]
+            }
+            for key in changed_keys:
+                if key in data:
+                    scene_data[key] = copy.deepcopy(data[key])
+                else:
+                    scene_data.pop(key)
+            break
+    SceneDataCache.mark_dirty(changed_keys)
+
+
+def patch_scene_data(upserts, deletes=None):
+    """Write only specified keys of scene metadata to Harmony.
+
+    Bypasses :class:`SceneDataCache`, prefer `imprint` or `set_scene_data`.
+
+    Args:
+        upserts (dict): Top level keys with data to set.
+        deletes (Optional[list[str]]): Top level keys to remove.
+
+    Returns:
+        list[int]: Revisions of scene metadata before and after the patch.
+
+    """
+    return send(
         {
-            "function": "AyonHarmonyAPI.setSceneData",
-            "args": data
-        })
+            "function": "AyonHarmonyAPI.patchSceneData",
+            "args": [upserts, list(deletes or [])]
+        })["result"]
+
+
+def get_scene_data_keys(keys):
+    """Get only specified keys of scene metadata from Harmony.
+
+    Args:
+        keys (Iterable[str]): Top level keys to get.
+
+    Returns:
+        dict: Metadata of keys which exist in the scene.
+
+    """
+    try:
+        return send(
+            {
+                "function": "AyonHarmonyAPI.getSceneDataKeys",
+                "args": list(keys)
+            })["result"] or {}
+    except KeyError:
+        return {}
+
+
+def flush_scene_data():
+    """Write not flushed scene metadata changes to Harmony."""
+    SceneDataCache.flush()
+
+
+def invalidate_scene_data():
+    """Drop cached scene metadata so they are fetched again on next use.
+
+    Should be called when a different scene is opened in Harmony.
+    """
+    SceneDataCache.invalidate()
+
+
+@contextlib.contextmanager
+def deferred_scene_data_flush():
+    """Write back all scene metadata changes at the end of the context.
+
+    Use this around operations that imprint multiple nodes (create, update
+    or load) to send scene metadata to Harmony only once.
+    """
+    with SceneDataCache.lock:
+        SceneDataCache.defer_depth += 1
+    try:
+        yield
+    finally:
+        with SceneDataCache.lock:
+            SceneDataCache.defer_depth -= 1
+            finished = SceneDataCache.defer_depth == 0
+            if finished:
+                SceneDataCache.validated = False
+        if finished:
+            SceneDataCache.flush()
 
 
 def read(node_id):
@@ -489,9 +1161,17 @@ def read(node_id):
     Returns:
         dict
     """
-    scene_data = get_scene_data()
-    if node_id in scene_data:
-        return scene_data[node_id]
+    with SceneDataCache.lock:
+        cached = SceneDataCache.data is not None
+
+    if not cached:
+        # Don't fetch whole scene metadata for single node.
+        return get_scene_data_keys([node_id]).get(node_id, {})
+
+    scene_data = SceneDataCache.get()
+    with SceneDataCache.lock:
+        if node_id in scene_data:
+            return copy.deepcopy(scene_data[node_id])
 
     return {}
 
@@ -503,9 +1183,14 @@ def remove(node_id):
         Args:
             node_id (str): full name (eg. 'Top/renderAnimation')
     """
-    data = get_scene_data()
-    del data[node_id]
-    set_scene_data(data)
+    while True:
+        scene_data = SceneDataCache.get()
+        with SceneDataCache.lock:
+            if SceneDataCache.data is not scene_data:
+                continue
+            del scene_data[node_id]
+            break
+    SceneDataCache.mark_dirty([node_id])
 
 
 def delete_node(node):
@@ -525,14 +1210,12 @@ def get_all_top_names() -> set:
         set: Set of top node names.
 
     """
-    nodes = send({"function": "node.subNodes", "args": ["Top"]})["result"]
-    backdrops = {
-        backdrop["title"]["text"]
-        for backdrop in send(
-            {"function": "Backdrop.backdrops", "args": ["Top"]}
-        )["result"]
-    }
-    return set(nodes) | backdrops
+    nodes, backdrops = send_batch([
+        {"function": "node.subNodes", "args": ["Top"]},
+        {"function": "Backdrop.backdrops", "args": ["Top"]},
+    ])
+    backdrop_names = {backdrop["title"]["text"] for backdrop in backdrops}
+    return set(nodes) | backdrop_names
 
 
 def get_palettes_paths() -> set:
@@ -560,22 +1243,111 @@ def imprint(node_id, data, remove=False):
         >>> data = {"str": "something", "int": 1, "float": 0.32, "bool": True}
         >>> lib.imprint(layer, data)
     """
-    scene_data = get_scene_data()
+    while True:
+        scene_data = SceneDataCache.get()
+        with SceneDataCache.lock:
+            if SceneDataCache.data is not scene_data:
+                # Dropped while it was validated, try again.
+                continue
+
+            if remove:
+                if node_id not in scene_data:
+                    return
+                scene_data.pop(node_id, None)
+            else:
+                data = copy.deepcopy(data)
+                if node_id in scene_data:
+                    scene_data[node_id].update(data)
+                else:
+                    scene_data[node_id] = data
+            break
 
-    if remove and (node_id in scene_data):
-        scene_data.pop(node_id, None)
-    else:
-        if node_id in scene_data:
-            scene_data[node_id].update(data)
-        else:
-            scene_data[node_id] = data
+    SceneDataCache.mark_dirty([node_id])
+
+
+def imprint_many(data_by_node_id, remove=False):
+    """Write data of multiple nodes with a single request to Harmony.
+
+    Arguments:
+        data_by_node_id (dict[str, dict]): Data to imprint by node path or
+            id of object.
+        remove (bool): Removes the data of all nodes from the scene.
 
-    set_scene_data(scene_data)
+    Example:
+        >>> from ayon_harmony.api import lib
+        >>> lib.imprint_many({
+        ...     "Top/renderMain": {"active": True},
+        ...     "Top/renderBG": {"active": False},
+        ... })
+    """
+    with deferred_scene_data_flush():
+        for node_id, data in data_by_node_id.items():
+            imprint(node_id, data, remove=remove)
 
 
 def send(request):
-    """Public method for sending requests to Harmony."""
-    return ProcessContext.server.send(request)
+    """Public method for sending requests to Harmony.
+
+    Scripts of plugins are loaded by Harmony on demand. Request calling
+    function of module which is not loaded yet is not executed, Harmony
+    replies with `missing_modules` instead and the request is sent again
+    once the modules are injected.
+    """
+    reply = ProcessContext.server.send(request)
+    if reply and reply.get("missing_modules"):
+        from .pipeline import get_js_modules_script
+
+        log.debug(f"Loading JS modules {reply['missing_modules']}")
+        ProcessContext.server.send({
+            "script": get_js_modules_script(reply["missing_modules"])
+        })
+        reply = ProcessContext.server.send(request)
+    return reply
+
+
+def ipc_stats():
+    """Statistics of requests sent to Harmony over current connection.
+
+    Returns:
+        dict[str, dict[str, Any]]: Call count, bytes in/out and p50/p95/max
+            latency in milliseconds by called function.
+
+    """
+    if ProcessContext.server is None:
+        return {}
+    return ProcessContext.server.ipc_stats.report()
+
+
+def reset_ipc_stats():
+    """Drop statistics of requests sent to Harmony."""
+    if ProcessContext.server is not None:
+        ProcessContext.server.ipc_stats.reset()
+
+
+def send_batch(requests):
+    """Send multiple function calls to Harmony in a single request.
+
+    Calls are executed by Harmony in the given order and only one
+    round-trip is made for all of them.
+
+    Example:
+        >>> from ayon_harmony.api import lib
+        >>> nodes, version = lib.send_batch([
+        ...     {"function": "node.subNodes", "args": ["Top"]},
+        ...     {"function": "AyonHarmony.getVersion"},
+        ... ])
+
+    Args:
+        requests (list[dict]): Function calls with "function" and optional
+            "args" keys.
+
+    Returns:
+        list: Results of the calls in the same order as requests.
+
+    """
+    if not requests:
+        return []
+    return send({"batch": list(requests)})["result"]
 
 
 def select_nodes(nodes):
@@ -591,17 +1363,11 @@ def select_nodes(nodes):
 @contextlib.contextmanager
 def maintained_nodes_state(nodes):
     """Maintain nodes states during context."""
-    # Collect current state.
-    states = send(
-        {
-            "function": "AyonHarmonyAPI.areEnabled", "args": nodes
-        })["result"]
-
-    # Disable all nodes.
-    send(
-        {
-            "function": "AyonHarmonyAPI.disableNodes", "args": nodes
-        })
+    # Collect current state and disable all nodes.
+    states, _ = send_batch([
+        {"function": "AyonHarmonyAPI.areEnabled", "args": nodes},
+        {"function": "AyonHarmonyAPI.disableNodes", "args": nodes},
+    ])
 
     try:
         yield
@@ -623,14 +1389,21 @@ def save_scene(zip_and_move=True):
     saves the scene.
 
     """
+    flush_scene_data()
+
+    # Scene folder can't be archived while Harmony saves to it.
+    scene_dir = send({"function": "scene.currentProjectPath"})["result"]
+    cancelled_jobs = cancel_zip_and_move(scene_dir)
+
     # Need to turn off the background watcher else the communication with
     # the server gets spammed with two requests at the same time.
     scene_path = send(
         {"function": "AyonHarmonyAPI.saveScene"})["result"]
 
-    # # Manually update the remote file.
-    if zip_and_move:
-        on_file_changed(scene_path, threaded=False)
+    # # Manually update the remote file, also when previous save of
+    # #   the scene did not finish.
+    if zip_and_move or cancelled_jobs:
+        on_file_changed(scene_path)
 
     # Re-enable the background watcher.
     send({"function": "AyonHarmonyAPI.enableFileWather"})
@@ -644,6 +1417,11 @@ def save_scene_as(filepath):
         os.path.splitext(os.path.basename(filepath))[0] + ".zip"
     )
 
+    reference_dir = None
+    if ProcessContext.workfile_path:
+        reference_dir = get_local_harmony_path(ProcessContext.workfile_path)
+
+    cancel_zip_and_move(scene_dir)
     if os.path.exists(scene_dir):
         try:
             shutil.rmtree(scene_dir)
@@ -651,11 +1429,18 @@ def save_scene_as(filepath):
             log.error(f"Cannot remove {scene_dir}")
             raise Exception(f"Cannot remove {scene_dir}") from e
 
+    flush_scene_data()
     send(
         {"function": "scene.saveAs", "args": [scene_dir]}
     )["result"]
+    # Manifest of removed folder is kept for incremental archiving of the
+    #   new save, without the folder it is orphaned.
+    if not os.path.isdir(scene_dir):
+        archive.remove_manifest(scene_dir)
 
-    zip_and_move(scene_dir, destination)
+    zip_and_move_in_background(
+        scene_dir, destination, reference=reference_dir
+    )
 
     ProcessContext.workfile_path = destination
 
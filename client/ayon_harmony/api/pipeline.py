@@ -1,4 +1,8 @@
 import os
+import re
+import glob
+import json
+import hashlib
 from pathlib import Path
 import logging
 
@@ -23,9 +27,15 @@ from ayon_core.pipeline.load import get_outdated_containers
 from ayon_core.pipeline.context_tools import get_current_task_entity
 
 from ayon_harmony import HARMONY_ADDON_ROOT
+from ayon_harmony.version import __version__
 import ayon_harmony.api as harmony
 
-from .lib import get_scene_data, set_scene_data
+from .lib import (
+    get_scene_data,
+    set_scene_data,
+    flush_scene_data,
+    invalidate_scene_data,
+)
 from .workio import (
     open_file,
     save_file,
@@ -43,6 +53,19 @@ LOAD_PATH = os.path.join(PLUGINS_DIR, "load")
 CREATE_PATH = os.path.join(PLUGINS_DIR, "create")
 INVENTORY_PATH = os.path.join(PLUGINS_DIR, "inventory")
 
+JS_DIR = os.path.join(HARMONY_ADDON_ROOT, "js")
+# Scripts of plugins loaded by Harmony when they are used the first time.
+JS_MODULE_DIRS = ("creators", "loaders", "publish")
+# Assignment of object defined by module, e.g. 'AyonHarmony.Loaders.X = '.
+JS_MODULE_EXPORT_REGEX = re.compile(
+    r"^AyonHarmony\.(Loaders|Creators|Publish)\.(\w+)\s*=", re.MULTILINE
+)
+JS_BUNDLE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".ayon", "harmony", ".js"
+)
+# Last bundle built by this process.
+_js_bundle_cache = {}
+
 
 class HarmonyHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     name = "harmony"
@@ -71,6 +94,14 @@ class HarmonyHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     def save_workfile(self, filepath=None):
         return save_file(filepath)
 
+    def invalidate_scene_data_cache(self):
+        """Drop cached scene metadata, e.g. after scene was reopened."""
+        invalidate_scene_data()
+
+    def flush_scene_data_cache(self):
+        """Write cached scene metadata changes to Harmony."""
+        flush_scene_data()
+
     def work_root(self, session):
         return work_root(session)
 
@@ -191,23 +222,188 @@ def check_inventory():
     harmony.send({"function": "AyonHarmony.message", "args": msg})
 
 
+def _get_js_module_paths():
+    """Paths of scripts of plugins by module name, e.g. 'loaders/X'."""
+    modules = {}
+    for item in JS_MODULE_DIRS:
+        dir_to_scan = os.path.join(JS_DIR, item)
+        for filename in sorted(os.listdir(dir_to_scan)):
+            name, ext = os.path.splitext(filename)
+            if ext == ".js":
+                path = os.path.join(dir_to_scan, filename)
+                modules[f"{item}/{name}"] = path
+    return modules
+
+
+def _get_js_bundle_sources():
+    """Paths of scripts injected to Harmony at launch, in order."""
+    return [
+        os.path.join(JS_DIR, "AyonHarmony.js"),
+        os.path.join(os.path.dirname(__file__), "js", "AyonHarmonyAPI.js"),
+    ]
+
+
+def _minify_js(script):
+    """Strip comments, indentation and empty lines from script.
+
+    Only whole line comments are removed and line breaks are kept, so
+    automatic semicolon insertion and string literals are not affected.
+    """
+    lines = []
+    in_comment = False
+    for line in script.splitlines():
+        stripped = line.strip()
+        if not in_comment and stripped.startswith("/*"):
+            in_comment = True
+            stripped = stripped[2:]
+        if in_comment:
+            if "*/" not in stripped:
+                continue
+            in_comment = False
+            stripped = stripped.split("*/", 1)[1].strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+def get_js_bundle():
+    """Get minified bundle of AYON scripts for Harmony.
+
+    Bundle contains `AyonHarmony.js`, `AyonHarmonyAPI.js` and registry of
+    modules of plugins which are loaded on demand. Bundle is keyed by addon
+    version and size and modification time of all scripts, it is built once
+    and cached on disk.
+
+    Returns:
+        tuple[str, str]: Hash of bundle and its script.
+
+    """
+    sources = _get_js_bundle_sources()
+    module_paths = _get_js_module_paths()
+    digest = hashlib.sha1(__version__.encode("utf-8"))
+    for path in sources + list(module_paths.values()):
+        stat = os.stat(path)
+        digest.update(
+            f"{os.path.relpath(path, HARMONY_ADDON_ROOT)}"
+            f":{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")
+        )
+    bundle_hash = digest.hexdigest()
+    if _js_bundle_cache.get("hash") == bundle_hash:
+        return bundle_hash, _js_bundle_cache["script"]
+
+    cache_path = os.path.join(
+        JS_BUNDLE_CACHE_DIR, f"ayon_harmony_{bundle_hash}.js"
+    )
+    try:
+        with open(cache_path, encoding="utf-8") as stream:
+            script = stream.read()
+    except OSError:
+        # Plugins are only registered, their modules are sent on demand.
+        lazy_modules = {}
+        for name, path in module_paths.items():
+            content = Path(path).read_text(encoding="utf-8")
+            for namespace, object_name in JS_MODULE_EXPORT_REGEX.findall(
+                content
+            ):
+                lazy_modules[f"{namespace}.{object_name}"] = name
+
+        ayon_harmony_js, ayon_harmony_api_js = (
+            _minify_js(Path(path).read_text(encoding="utf-8"))
+            for path in sources
+        )
+        script = "\n".join((
+            ayon_harmony_js,
+            "AyonHarmony.registerModules({});".format(
+                json.dumps(lazy_modules, sort_keys=True)
+            ),
+            ayon_harmony_api_js,
+            f'AyonHarmony.bundleHash = "{bundle_hash}";\n',
+        ))
+        _write_js_bundle_cache(cache_path, script)
+
+    _js_bundle_cache.update({"hash": bundle_hash, "script": script})
+    return bundle_hash, script
+
+
+def get_js_modules_script(modules):
+    """Get script of lazily loaded modules of plugins.
+
+    Args:
+        modules (Iterable[str]): Names of modules, e.g. 'loaders/X'.
+
+    Returns:
+        str: Minified scripts of the modules.
+
+    Raises:
+        ValueError: Unknown module was requested.
+
+    """
+    module_paths = _get_js_module_paths()
+    scripts = []
+    for name in modules:
+        path = module_paths.get(name)
+        if path is None:
+            raise ValueError(f"Unknown JS module '{name}'.")
+        scripts.append(_minify_js(Path(path).read_text(encoding="utf-8")))
+    return "\n".join(scripts)
+
+
+def _write_js_bundle_cache(cache_path, script):
+    try:
+        os.makedirs(JS_BUNDLE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as stream:
+            stream.write(script)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        log.warning("Failed to cache JS bundle.", exc_info=True)
+        return
+
+    # Bundles of other versions are not needed anymore.
+    for path in glob.glob(
+        os.path.join(glob.escape(JS_BUNDLE_CACHE_DIR), "ayon_harmony_*.js")
+    ):
+        if path != cache_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def inject_js_bundle(force=False):
+    """Inject AYON scripts to Harmony in single message.
+
+    Injection is skipped when Harmony already evaluated the same bundle.
+
+    Args:
+        force (bool): Inject even if the same bundle is loaded.
+
+    Returns:
+        bool: Bundle was injected.
+
+    """
+    bundle_hash, script = get_js_bundle()
+    if not force:
+        loaded_hash = harmony.send({
+            "function": (
+                "(function() { return typeof AyonHarmony === 'undefined'"
+                " ? null : AyonHarmony.bundleHash || null; })"
+            )
+        })["result"]
+        if loaded_hash == bundle_hash:
+            log.debug("AYON scripts are already loaded in Harmony.")
+            return False
+
+    harmony.send({"script": script})
+    return True
+
+
 def application_launch(event):
     """Event that is executed after Harmony is launched."""
-    # fills AYON_HARMONY_JS
-    ayon_harmony_path = Path(__file__).parent.parent / "js" / "AyonHarmony.js"
-    ayon_harmony_js = ayon_harmony_path.read_text()
-
-    # go through js/creators, loaders and publish folders and load all scripts
-    script = ""
-    for item in ["creators", "loaders", "publish"]:
-        dir_to_scan = Path(__file__).parent.parent / "js" / item
-        for child in dir_to_scan.iterdir():
-            script += child.read_text()
-
-    # send scripts to Harmony
-    harmony.send({"script": ayon_harmony_js})
-    harmony.send({"script": script})
-    inject_ayon_js()
+    # AyonHarmony.js and AyonHarmonyAPI.js, scripts of plugins are
+    #   loaded when they are used.
+    inject_js_bundle()
 
     # ensure_scene_settings()
     check_inventory()
@@ -109,16 +109,19 @@ class HarmonyCreator(Creator, HarmonyCreatorBase):
         return instance
 
     def update_instances(self, update_list):
-        for created_inst, _changes in update_list:
-            node = created_inst.transient_data["node"]
-            new_data = created_inst.data_to_store()
-
-            harmony.imprint(node, new_data)
+        harmony.imprint_many({
+            created_inst.transient_data["node"]: created_inst.data_to_store()
+            for created_inst, _changes in update_list
+        })
 
     def remove_instances(self, instances):
+        nodes = [instance.transient_data["node"] for instance in instances]
+        harmony.send_batch([
+            {"function": "AyonHarmonyAPI.deleteNode", "args": node}
+            for node in nodes
+        ])
+        harmony.imprint_many({node: {} for node in nodes}, remove=True)
         for instance in instances:
-            # There is only ever one workfile instance
-            harmony.delete_node(instance.transient_data["node"])
             self._remove_instance_from_context(instance)
 
     def collect_instances(self):
@@ -291,14 +294,16 @@ class HarmonyRenderCreator(HarmonyCreator):
         super().update_instances(update_list)
 
         # Use the node's active state to store the instance's active state
+        nodes = []
+        states = []
         for created_inst, _changes in update_list:
-            node = created_inst.transient_data["node"]
-            new_data = created_inst.data_to_store()
+            nodes.append(created_inst.transient_data["node"])
+            states.append(created_inst.data_to_store().get("active", True))
 
-            active = new_data.get("active", True)
+        if nodes:
             harmony.send(
                 {"function": "AyonHarmonyAPI.setState",
-                 "args": [[node], [active]]}
+                 "args": [nodes, states]}
             )
 
     def get_active_state(self, instance: CreatedInstance):
@@ -393,13 +398,13 @@ class HarmonyAutoCreator(HarmonyCreatorBase, AutoCreator):
             self._add_instance_to_context(created_instance)
 
     def update_instances(self, update_list):
-        for created_inst, _changes in update_list:
-            harmony.lib.imprint(self._node_name, created_inst.data_to_store())
+        harmony.imprint_many({
+            self._node_name: created_inst.data_to_store()
+            for created_inst, _changes in update_list
+        })
 
     def remove_instances(self, instances):
+        if instances:
+            harmony.imprint_many({self._node_name: {}}, remove=True)
         for instance in instances:
-            scene_data = harmony.lib.get_scene_data()
-            scene_data.pop(self._node_name, None)
-            harmony.lib.set_scene_data(scene_data)
-
             self._remove_instance_from_context(instance)
@@ -1,42 +1,214 @@
 # -*- coding: utf-8 -*-
-"""Server-side implementation of Toon Boon Harmony communication."""
+"""Server-side implementation of Toon Boon Harmony communication.
+
+Set `AYON_HARMONY_IPC_TRACE` environment variable to `1` to enable debug
+logging of the communication and to write full messages to rotating trace
+file. Path to the file can be changed with `AYON_HARMONY_IPC_TRACE_FILE`.
+"""
+import os
+import re
 import socket
+import tempfile
 import logging
+import logging.handlers
 import json
 import traceback
 import importlib
 import functools
+import concurrent.futures
 import time
 import struct
+import zlib
 from datetime import datetime
 import threading
 from . import lib
 
 
+def is_ipc_trace_enabled():
+    """Is tracing of Harmony communication enabled.
+
+    Returns:
+        bool: True if `AYON_HARMONY_IPC_TRACE` is set to truthy value.
+
+    """
+    value = os.getenv("AYON_HARMONY_IPC_TRACE") or ""
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def get_ipc_trace_logger():
+    """Get logger writing full messages to rotating trace file.
+
+    Returns:
+        logging.Logger: Trace logger.
+
+    """
+    trace_log = logging.getLogger(f"{__name__}.trace")
+    if not trace_log.handlers:
+        trace_path = os.getenv("AYON_HARMONY_IPC_TRACE_FILE") or os.path.join(
+            tempfile.gettempdir(), "ayon_harmony_ipc_trace.log"
+        )
+        handler = logging.handlers.RotatingFileHandler(
+            trace_path,
+            maxBytes=50 * 1024 * 1024,
+            backupCount=3,
+            encoding="utf-8",
+        )
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s %(message)s")
+        )
+        trace_log.addHandler(handler)
+        trace_log.setLevel(logging.DEBUG)
+        trace_log.propagate = False
+    return trace_log
+
+
+class IPCStats:
+    """Call counts, transferred bytes and latencies of requests to Harmony.
+
+    Statistics are collected per called function. Inline functions created
+    with `lib.signature` are grouped by their postfix.
+    """
+
+    _signature_regex = re.compile(
+        r"^f[0-9a-f]{8}(_[0-9a-f]{4}){3}_[0-9a-f]{12}_"
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    @classmethod
+    def get_request_name(cls, request):
+        """Get name under which request is recorded.
+
+        Args:
+            request (dict): Request sent to Harmony.
+
+        Returns:
+            str: Function name, 'batch' or 'script'.
+
+        """
+        function = request.get("function")
+        if function is None:
+            if "batch" in request:
+                return "batch"
+            if "script" in request:
+                return "script"
+            return "unknown"
+
+        # Inline function source ends with name of function to call.
+        lines = [line for line in function.splitlines() if line.strip()]
+        name = lines[-1].strip() if lines else function
+        return cls._signature_regex.sub("inline_", name)
+
+    def add(self, name, latency, bytes_out, bytes_in):
+        """Record single request.
+
+        Args:
+            name (str): Name of the request.
+            latency (float): Seconds from sending to receiving reply.
+            bytes_out (int): Size of the request.
+            bytes_in (int): Size of the reply.
+
+        """
+        with self._lock:
+            item = self._calls.setdefault(
+                name, {"latencies": [], "bytes_out": 0, "bytes_in": 0}
+            )
+            item["latencies"].append(latency)
+            item["bytes_out"] += bytes_out
+            item["bytes_in"] += bytes_in
+
+    def reset(self):
+        """Drop all recorded requests."""
+        with self._lock:
+            self._calls = {}
+
+    def report(self):
+        """Summarize recorded requests.
+
+        Returns:
+            dict[str, dict[str, Any]]: Statistics by request name sorted by
+                total time spent waiting for Harmony. Times are in
+                milliseconds.
+
+        """
+        with self._lock:
+            calls = {
+                name: (sorted(item["latencies"]), dict(item))
+                for name, item in self._calls.items()
+            }
+
+        output = {}
+        for name, (latencies, item) in sorted(
+            calls.items(), key=lambda i: sum(i[1][0]), reverse=True
+        ):
+            output[name] = {
+                "calls": len(latencies),
+                "bytes_out": item["bytes_out"],
+                "bytes_in": item["bytes_in"],
+                "total_ms": sum(latencies) * 1000,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "max_ms": latencies[-1] * 1000,
+            }
+        return output
+
+
+def _percentile(sorted_values, percent):
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
 class Server(threading.Thread):
     """Class for communication with Toon Boon Harmony.
 
     Attributes:
         connection (Socket): connection holding object.
-        received (str): received data buffer.any(iterable)
         port (int): port number.
         message_id (int): index of last message going out.
         queue (dict): dictionary holding queue of incoming messages.
+        reply_timeout (float): seconds to wait for a reply before logging
+            a retry.
+        compression_threshold (int): minimal size of message in bytes to be
+            sent compressed, when client supports compression.
+        compression_level (int): zlib compression level.
+        summary_length (int): messages in debug log are truncated to this
+            number of characters.
 
     """
 
+    reply_timeout = 30
+    reply_retries = 30
+    compression_threshold = 64 * 1024
+    compression_level = 1
+    summary_length = 200
+
     def __init__(self, port):
         """Constructor."""
         super(Server, self).__init__()
         self.daemon = True
         self.connection = None
-        self.received = ""
         self.port = port
-        self.message_id = 1
+        self.message_id = 0
+        self._message_id_lock = threading.Lock()
+        # Socket writes from multiple threads must not interleave.
+        self._send_lock = threading.Lock()
+        # Events of requests waiting for a reply and received replies,
+        #   both keyed by message id.
+        self._pending_lock = threading.Lock()
+        self._reply_events = {}
+        self._replies = {}
+        self._connected = threading.Event()
+        # Set once Harmony disconnected or server was stopped.
+        self.closed = False
 
         # Setup logging.
         self.log = logging.getLogger(__name__)
-        self.log.setLevel(logging.DEBUG)
+        self.trace_log = None
+        if is_ipc_trace_enabled():
+            self.log.setLevel(logging.DEBUG)
+            self.trace_log = get_ipc_trace_logger()
 
         # Create a TCP/IP socket
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -53,6 +225,46 @@ class Server(threading.Thread):
         self.socket.listen(1)
         self.queue = {}
 
+        self.ipc_stats = IPCStats()
+
+        # Capabilities announced by the client on connection.
+        self.client_capabilities = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "frames_out": 0,
+            "frames_in": 0,
+            "compressed_frames_out": 0,
+            "compressed_frames_in": 0,
+            "raw_bytes_out": 0,
+            "wire_bytes_out": 0,
+            "raw_bytes_in": 0,
+            "wire_bytes_in": 0,
+        }
+
+    def compression_stats(self):
+        """Return statistics of data transferred over the connection.
+
+        Returns:
+            dict[str, int]: Frames and bytes counts, `raw_bytes_*` are sizes
+                of messages, `wire_bytes_*` are sizes sent over socket.
+
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["bytes_saved"] = (
+            stats["raw_bytes_out"] - stats["wire_bytes_out"]
+            + stats["raw_bytes_in"] - stats["wire_bytes_in"]
+        )
+        return stats
+
+    def _add_stats(self, direction, raw_size, wire_size, compressed):
+        with self._stats_lock:
+            self._stats[f"frames_{direction}"] += 1
+            self._stats[f"raw_bytes_{direction}"] += raw_size
+            self._stats[f"wire_bytes_{direction}"] += wire_size
+            if compressed:
+                self._stats[f"compressed_frames_{direction}"] += 1
+
     def process_request(self, request):
         """Process incoming request.
 
@@ -62,12 +274,17 @@ class Server(threading.Thread):
                 "method" (str),  # Name of method in module.
                 "args" (list),  # Arguments to pass to method.
                 "kwargs" (dict),  # Keyword arguments to pass to method.
-                "reply" (bool),  # Optional wait for method completion.
+                "await_result" (bool),  # Optional reply with result.
             }
+
+        Returns:
+            concurrent.futures.Future: Future resolved once the method
+                finished in the main thread.
         """
-        pretty = self._pretty(request)
-        self.log.debug(
-            f"[{self.timestamp()}] Processing request:\n{pretty}")
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                f"[{self.timestamp()}] Processing request: "
+                f"{request.get('module')}.{request.get('method')}")
 
         # TODO javascript should not define which module is imported and
         #   which function is called. It should send predefined requests.
@@ -79,9 +296,38 @@ class Server(threading.Thread):
             kwargs = request.get("kwargs", {})
             partial_method = functools.partial(method, *args, **kwargs)
 
-            lib.ProcessContext.execute_in_main_thread(partial_method)
-        except Exception:
+            return lib.ProcessContext.execute_in_main_thread(partial_method)
+        except Exception as exc:
             self.log.error(traceback.format_exc())
+            future = concurrent.futures.Future()
+            future.set_exception(exc)
+            return future
+
+    def _reply_with_result(self, request, future):
+        """Send result of finished request back to Harmony.
+
+        Args:
+            request (dict): Request initiated from Harmony.
+            future (concurrent.futures.Future): Finished future of
+                the request.
+
+        """
+        reply = {
+            "message_id": request.get("message_id"),
+            "reply": True,
+            "result": None,
+        }
+        try:
+            reply["result"] = future.result()
+            # Result must be serializable to be sent back.
+            json.dumps(reply["result"])
+        except concurrent.futures.CancelledError:
+            reply["result"] = None
+            reply["error"] = "Request was cancelled."
+        except Exception as exc:
+            reply["result"] = None
+            reply["error"] = f"{exc.__class__.__name__}: {exc}"
+        self.send(reply)
 
     def receive(self):
         """Receives data from `self.connection`.
@@ -89,12 +335,15 @@ class Server(threading.Thread):
         When the data is a json serializable string, a reply is sent then
         processing of the request.
         """
-        current_time = time.time()
         while True:
             # Receive the data in small chunks and retransmit it
             request = None
+            connection = self.connection
+            if connection is None:
+                # Server was stopped.
+                break
             try:
-                header = self.connection.recv(10)
+                header = connection.recv(10)
             except OSError:
                 # could happen on MacOS
                 self.log.info("")
@@ -105,64 +354,141 @@ class Server(threading.Thread):
                 self.log.info(f"[{self.timestamp()}] Connection closing.")
                 break
 
-            if header[0:2] != b"AH":
+            if len(header) < 10:
+                header += self._recv_exactly(10 - len(header))
+
+            magic = header[0:2]
+            if magic not in (b"AH", b"AZ"):
                 self.log.error("INVALID HEADER")
             content_length_str = header[2:].decode()
 
             length = int(content_length_str, 16)
-            data = self.connection.recv(length)
-            while (len(data) < length):
-                # we didn't received everything in first try, lets wait for
-                # all data.
-                self.log.info("loop")
-                time.sleep(0.1)
-                if self.connection is None:
-                    self.log.error(f"[{self.timestamp()}] "
-                                   "Connection is broken")
-                    break
-                if time.time() > current_time + 30:
-                    self.log.error(f"[{self.timestamp()}] Connection timeout.")
-                    break
-
-                data += self.connection.recv(length - len(data))
-            self.log.debug("data:: {} {}".format(data, type(data)))
-            self.received += data.decode("utf-8")
-            pretty = self._pretty(self.received)
-            self.log.debug(
-                f"[{self.timestamp()}] Received:\n{pretty}")
+            data = self._recv_exactly(length)
+            wire_size = len(data)
+            if magic == b"AZ":
+                # Compressed frame, first 4 bytes hold uncompressed size.
+                data = zlib.decompress(data[4:])
+            self._add_stats("in", len(data), wire_size, magic == b"AZ")
+            received = data.decode("utf-8")
+            self._trace("Received", None, received)
 
             try:
-                request = json.loads(self.received)
+                request = json.loads(received)
             except json.decoder.JSONDecodeError as e:
                 self.log.error(f"[{self.timestamp()}] "
                                f"Invalid message received.\n{e}",
                                exc_info=True)
 
-            self.received = ""
             if request is None:
                 continue
 
-            if "message_id" in request.keys():
-                message_id = request["message_id"]
-                self.message_id = message_id + 1
+            if "capabilities" in request.keys():
+                self._negotiate(request)
+                continue
+
+            message_id = request.get("message_id")
+            if "reply" in request.keys():
+                self._resolve_reply(message_id, request, len(data))
+                continue
+
+            # Request initiated from Harmony. When Harmony awaits result
+            #   the reply is sent once the request is processed, otherwise
+            #   the request is acknowledged right away.
+            if message_id is not None:
                 self.log.debug(f"--- storing request as {message_id}")
                 self.queue[message_id] = request
-            if "reply" not in request.keys():
+            if request.get("await_result"):
+                future = self.process_request(request)
+                future.add_done_callback(
+                    functools.partial(self._reply_with_result, request)
+                )
+            else:
                 request["reply"] = True
                 self.send(request)
                 self.process_request(request)
 
-                if "message_id" in request.keys():
-                    try:
-                        self.log.debug(f"[{self.timestamp()}] "
-                                       f"Removing from the queue {message_id}")
-                        del self.queue[message_id]
-                    except IndexError:
-                        self.log.debug(f"[{self.timestamp()}] "
-                                       f"{message_id} is no longer in queue")
-            else:
+            if message_id is not None:
+                self.log.debug(f"[{self.timestamp()}] "
+                               f"Removing from the queue {message_id}")
+                self.queue.pop(message_id, None)
+
+    def _negotiate(self, request):
+        """Store capabilities of client and reply with server ones.
+
+        Args:
+            request (dict): Handshake message with client capabilities.
+
+        """
+        self.client_capabilities = request["capabilities"] or {}
+        self.log.debug(
+            f"[{self.timestamp()}] Client capabilities: "
+            f"{self.client_capabilities}")
+        self.send({
+            "capabilities": {"compression": "zlib"},
+            "message_id": request.get("message_id"),
+            "reply": True,
+        })
+
+    def _recv_exactly(self, length):
+        """Receive exactly `length` bytes from `self.connection`.
+
+        Returns less data only when connection is broken or timed out.
+
+        Args:
+            length (int): Number of bytes to receive.
+
+        Returns:
+            bytes: Received data.
+
+        """
+        current_time = time.time()
+        data = b""
+        while len(data) < length:
+            # `recv` blocks until more data is available.
+            if self.connection is None:
+                self.log.error(f"[{self.timestamp()}] "
+                               "Connection is broken")
+                break
+            if data and time.time() > current_time + 30:
+                self.log.error(f"[{self.timestamp()}] Connection timeout.")
+                break
+
+            chunk = self.connection.recv(length - len(data))
+            if not chunk:
+                self.log.error(f"[{self.timestamp()}] "
+                               "Connection is broken")
+                break
+            data += chunk
+        return data
+
+    def _resolve_reply(self, message_id, reply, size):
+        """Hand over reply to the thread waiting for it.
+
+        Args:
+            message_id (int): Id of the request the reply belongs to.
+            reply (dict): Received reply.
+            size (int): Size of the reply in bytes.
+
+        """
+        with self._pending_lock:
+            reply_event = self._reply_events.get(message_id)
+            if reply_event is None:
                 self.log.debug(f"[{self.timestamp()}] "
                                "received data was just a reply.")
+                return
+            self._replies[message_id] = (reply, size)
+        reply_event.set()
+
+    def _next_message_id(self):
+        """Allocate unique id for outgoing message.
+
+        Returns:
+            int: Message id.
+
+        """
+        with self._message_id_lock:
+            self.message_id += 1
+            return self.message_id
 
     def run(self):
         """Entry method for server.
@@ -172,102 +498,192 @@ class Server(threading.Thread):
         # Wait for a connection
         timestamp = datetime.now().strftime("%H:%M:%S.%f")
         self.log.debug(f"[{timestamp}] Waiting for a connection.")
-        self.connection, client_address = self.socket.accept()
+        connection, client_address = self.socket.accept()
+        if self.closed:
+            # Connection made by 'stop' to unblock 'accept'.
+            connection.close()
+            return
+        self.connection = connection
 
         timestamp = datetime.now().strftime("%H:%M:%S.%f")
         self.log.debug(f"[{timestamp}] Connection from: {client_address}")
+        self._connected.set()
 
-        self.receive()
+        try:
+            self.receive()
+        except OSError:
+            self.log.info(
+                f"[{self.timestamp()}] Connection lost.", exc_info=True)
+        finally:
+            # Harmony is gone, nobody is going to reply anymore.
+            self._close_connection()
 
     def stop(self):
         """Shutdown socket server gracefully."""
         timestamp = datetime.now().strftime("%H:%M:%S.%f")
         self.log.debug(f"[{timestamp}] Shutting down server.")
-        if self.connection is None:
+        if self.connection is None and not self.closed:
             self.log.debug("Connect to shutdown.")
+            self.closed = True
             socket.socket(
                 socket.AF_INET, socket.SOCK_STREAM
             ).connect(("localhost", self.port))
 
-        self.connection.close()
-        self.connection = None
-
+        self._close_connection()
         self.socket.close()
 
-    def _send(self, message):
+    def _close_connection(self):
+        """Close connection and release callers waiting for a reply."""
+        self.closed = True
+        self._connected.clear()
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+        with self._pending_lock:
+            reply_events = list(self._reply_events.values())
+        for reply_event in reply_events:
+            reply_event.set()
+
+    def _send(self, message, message_id=None):
         """Send a message to Harmony.
 
         Args:
             message (str): Data to send to Harmony.
+            message_id (Optional[int]): Id of the message for logging.
+
+        Returns:
+            int: Size of the message in bytes.
         """
         # Wait for a connection.
-        while not self.connection:
-            pass
+        while not self._connected.wait(1):
+            if self.closed:
+                break
+        connection = self.connection
+        if self.closed or connection is None:
+            raise ConnectionError("Harmony is not connected.")
 
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")
+        self._trace("Sending", message_id, message)
         encoded = message.encode("utf-8")
-        coded_message = b"AH" + struct.pack('>I', len(encoded)) + encoded
-        pretty = self._pretty(coded_message)
-        self.log.debug(
-            f"[{timestamp}] Sending [{self.message_id}]:\n{pretty}")
-        self.log.debug(f"--- Message length: {len(encoded)}")
-        self.connection.sendall(coded_message)
-        self.message_id += 1
+        magic = b"AH"
+        payload = encoded
+        if (
+            len(encoded) >= self.compression_threshold
+            and self.client_capabilities.get("compression") == "zlib"
+        ):
+            # Same layout as Qt's 'qCompress', uncompressed size first.
+            compressed = struct.pack(">I", len(encoded)) + zlib.compress(
+                encoded, self.compression_level
+            )
+            if len(compressed) < len(encoded):
+                magic = b"AZ"
+                payload = compressed
+        coded_message = magic + struct.pack('>I', len(payload)) + payload
+        self._add_stats("out", len(encoded), len(payload), magic == b"AZ")
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                f"--- Message length: {len(encoded)} ({len(payload)} sent)")
+        with self._send_lock:
+            connection.sendall(coded_message)
+        return len(encoded)
 
     def send(self, request):
         """Send a request in dictionary to Harmony.
 
-        Waits for a reply from Harmony.
+        Waits for a reply from Harmony. The calling thread is blocked on
+        an event which is set by `receive` as soon as the reply with
+        matching message id arrives. Safe to be called from multiple threads
+        at once, each request gets unique message id.
 
         Args:
             request (dict): Data to send to Harmony.
         """
-        request["message_id"] = self.message_id
-        self._send(json.dumps(request))
         if request.get("reply"):
+            # Replies keep id of the request they belong to.
+            message_id = request.get("message_id")
+            self._send(json.dumps(request), message_id)
             timestamp = datetime.now().strftime("%H:%M:%S.%f")
             self.log.debug(
                 f"[{timestamp}] sent reply, not waiting for anything.")
             return None
-        result = None
-        current_time = time.time()
-        try_index = 1
-        while True:
-            time.sleep(0.1)
-            if time.time() > current_time + 30:
+
+        message_id = self._next_message_id()
+        request["message_id"] = message_id
+
+        # Register the event before sending so the reply can't be missed.
+        reply_event = threading.Event()
+        with self._pending_lock:
+            self._reply_events[message_id] = reply_event
+        start_time = time.perf_counter()
+        bytes_out = 0
+        try:
+            bytes_out = self._send(json.dumps(request), message_id)
+            try_index = 1
+            while not reply_event.wait(self.reply_timeout):
+                if self.closed:
+                    break
                 timestamp = datetime.now().strftime("%H:%M:%S.%f")
-                self.log.error((f"[{timestamp}][{self.message_id}] "
-                                "No reply from Harmony in 30s. "
+                self.log.error((f"[{timestamp}][{message_id}] "
+                                "No reply from Harmony in "
+                                f"{self.reply_timeout}s. "
                                 f"Retrying {try_index}"))
                 try_index += 1
-                current_time = time.time()
-            if try_index > 30:
-                break
-            try:
-                result = self.queue[request["message_id"]]
-                timestamp = datetime.now().strftime("%H:%M:%S.%f")
-                self.log.debug((f"[{timestamp}] Got request "
-                                f"id {self.message_id}, "
-                                "removing from queue"))
-                del self.queue[request["message_id"]]
-                break
-            except KeyError:
-                # response not in received queue yey
-                pass
-            try:
-                result = json.loads(self.received)
-                break
-            except json.decoder.JSONDecodeError:
-                pass
+                if try_index > self.reply_retries:
+                    break
+        finally:
+            with self._pending_lock:
+                self._reply_events.pop(message_id, None)
+                result, bytes_in = self._replies.pop(message_id, (None, 0))
+
+        self.ipc_stats.add(
+            IPCStats.get_request_name(request),
+            time.perf_counter() - start_time,
+            bytes_out,
+            bytes_in,
+        )
+        if result is not None:
+            timestamp = datetime.now().strftime("%H:%M:%S.%f")
+            self.log.debug((f"[{timestamp}] Got reply "
+                            f"id {message_id}"))
+        return result
 
-        self.received = ""
+    def notify(self, request):
+        """Send a request to Harmony without waiting for its reply.
 
-        return result
+        Args:
+            request (dict): Data to send to Harmony.
+        """
+        message_id = self._next_message_id()
+        request["message_id"] = message_id
+        bytes_out = self._send(json.dumps(request), message_id)
+        self.ipc_stats.add(
+            IPCStats.get_request_name(request), 0.0, bytes_out, 0
+        )
+
+    def _trace(self, label, message_id, message):
+        """Log message summary and write full message to trace file.
+
+        Message is formatted only if it is going to be logged.
 
-    def _pretty(self, message) -> str:
-        # result = pformat(message, indent=2)
-        # return result.replace("\\n", "\n")
-        return "{}{}".format(4 * " ", message)
+        Args:
+            label (str): Direction of the message.
+            message_id (Optional[int]): Id of the message.
+            message (str): Serialized message.
+
+        """
+        if self.trace_log is not None:
+            self.trace_log.debug(f"{label} [{message_id}]: {message}")
+
+        if not self.log.isEnabledFor(logging.DEBUG):
+            return
+        summary = message[:self.summary_length]
+        if len(message) > self.summary_length:
+            summary += f"... ({len(message)} characters)"
+        self.log.debug(
+            f"[{self.timestamp()}] {label} [{message_id}]: {summary}")
 
     def timestamp(self):
         """Return current timestamp as a string.
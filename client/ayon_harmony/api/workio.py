@@ -3,11 +3,15 @@ import os
 from pathlib import Path
 import shutil
 
+from . import archive
 from .lib import (
     ProcessContext,
     get_local_harmony_path,
     zip_and_move,
-    launch_zip_file
+    zip_and_move_in_background,
+    cancel_zip_and_move,
+    launch_zip_file,
+    flush_scene_data,
 )
 
 # used to lock saving until previous save is done.
@@ -37,19 +41,35 @@ def save_file(filepath):
 
     save_disabled = True
     cache_path = get_local_harmony_path(filepath)
+    # Files not changed since opened workfile was saved don't have to be
+    #   compressed again.
+    reference_path = None
+    if ProcessContext.workfile_path:
+        reference_path = get_local_harmony_path(ProcessContext.workfile_path)
 
     if ProcessContext.server:
+        # Folder is replaced by the new save, archiving of previous save
+        #   is not needed anymore.
+        cancel_zip_and_move(cache_path)
         if os.path.exists(cache_path):
             try:
                 shutil.rmtree(cache_path)
             except Exception as e:
                 raise Exception(f"cannot delete {cache_path}") from e
 
+        flush_scene_data()
         ProcessContext.server.send(
             {"function": "scene.saveAs", "args": [cache_path]}
         )
-
-        zip_and_move(cache_path, filepath)
+        # Manifest of removed folder is kept for incremental archiving of
+        #   the new save, which replaces it. Without the folder it is
+        #   orphaned.
+        if not os.path.isdir(cache_path):
+            archive.remove_manifest(cache_path)
+
+        zip_and_move_in_background(
+            cache_path, filepath, reference=reference_path
+        )
 
         ProcessContext.workfile_path = filepath
 
@@ -48,6 +48,10 @@ class HarmonyPrelaunchHook(PreLaunchHook):
 
     Existence of last workfile is checked. If workfile does not exists tries
     to copy templated workfile from predefined path.
+
+    Workfile is unzipped to local scene folder in background right away when
+    enabled in settings, so it is ready when Harmony launch script wants to
+    open it.
     """
     app_groups = {"harmony"}
 
@@ -79,8 +83,12 @@ class HarmonyPrelaunchHook(PreLaunchHook):
             and last_workfile_path
             and os.path.exists(last_workfile_path)
         ):
+            workfile_path = last_workfile_path
             new_launch_args.append(last_workfile_path)
 
+        if workfile_path:
+            self._prewarm_workfile(workfile_path)
+
         workfile_startup = self.data.get("workfile_startup", True)
 
         self.launch_context.env["AYON_HARMONY_WORKFILES_ON_LAUNCH"] = str(
@@ -96,3 +104,18 @@ class HarmonyPrelaunchHook(PreLaunchHook):
         self.launch_context.kwargs = get_launch_kwargs(
             self.launch_context.kwargs
         )
+
+    def _prewarm_workfile(self, workfile_path):
+        project_settings = self.data["project_settings"]
+        workfile_settings = project_settings["harmony"].get("workfile") or {}
+        if (
+            not workfile_settings.get("prewarm_local_scene")
+            or os.path.splitext(workfile_path)[1] != ".zip"
+            or not os.path.exists(workfile_path)
+        ):
+            return
+
+        from ayon_harmony.api.lib import prewarm_local_scene
+
+        self.log.info(f"Pre-warming local scene of '{workfile_path}'.")
+        prewarm_local_scene(workfile_path, project_settings)
@@ -23,6 +23,52 @@ var AyonHarmony = {
 };
 
 
+/**
+ * Modules of plugins loaded on demand.
+ * Maps path of object the module defines (e.g. `Loaders.PsdLoader`) to name
+ * of the module (e.g. `loaders/ImageLoader`) served by Python side.
+ */
+AyonHarmony.lazyModules = {};
+
+
+/**
+ * Register modules of plugins which are loaded on first use.
+ * @function
+ * @param {object} modules  Module names by path of objects they define.
+ */
+AyonHarmony.registerModules = function(modules) {
+    for (var key in modules) {
+        if (modules.hasOwnProperty(key)) {
+            AyonHarmony.lazyModules[key] = modules[key];
+        }
+    }
+};
+
+
+/**
+ * Get module which has to be loaded before function can be called.
+ * @function
+ * @param  {string} functionName  Called function, e.g.
+ *                                `AyonHarmony.Loaders.PsdLoader.importFiles`.
+ * @return {string} Name of not loaded module or null.
+ */
+AyonHarmony.getMissingModule = function(functionName) {
+    var match = /^AyonHarmony\.(\w+)\.(\w+)\./.exec(functionName);
+    if (!match) {
+        return null;
+    }
+    var module = AyonHarmony.lazyModules[match[1] + '.' + match[2]];
+    if (typeof module === 'undefined') {
+        return null;
+    }
+    var namespace = AyonHarmony[match[1]];
+    if (namespace && typeof namespace[match[2]] !== 'undefined') {
+        return null;
+    }
+    return module;
+};
+
+
 /**
  * Show message in Harmony.
  * @function
@@ -0,0 +1,263 @@
+/* global AyonHarmony:writable, include */
+// ***************************************************************************
+// *                        BackgroundLoader                                 *
+// ***************************************************************************
+
+
+// check if AyonHarmony is defined and if not, load it.
+if (typeof AyonHarmony === 'undefined') {
+    var AYON_HARMONY_JS = System.getenv('AYON_HARMONY_JS') + '/AyonHarmony.js';
+    include(AYON_HARMONY_JS.replace(/\\/g, "/"));
+}
+
+/**
+ * @namespace
+ * @classdesc Background loader JS code.
+ */
+var BackgroundLoader = function() {};
+
+// Functions are called without object by `callFunction`, so constants and
+//  helpers are reached through `BackgroundLoader`, not `this`.
+BackgroundLoader.PNGTransparencyMode = 1; // Premultiplied with Black
+BackgroundLoader.TGATransparencyMode = 0; // Premultiplied with Black
+BackgroundLoader.SGITransparencyMode = 0; // Premultiplied with Black
+BackgroundLoader.LayeredPSDTransparencyMode = 1; // Straight
+BackgroundLoader.FlatPSDTransparencyMode = 2; // Premultiplied with White
+
+
+/**
+ * Get unique column name.
+ * @function
+ * @param  {string} columnPrefix Column name.
+ * @return {string} Unique column name.
+ */
+BackgroundLoader.prototype.getUniqueColumnName = function(columnPrefix) {
+    var suffix = 0;
+    // finds if unique name for a column
+    var columnName = columnPrefix;
+    while (suffix < 2000) {
+        if (!column.type(columnName)) {
+            break;
+        }
+
+        suffix = suffix + 1;
+        columnName = columnPrefix + '_' + suffix;
+    }
+    return columnName;
+};
+
+
+/**
+ * Get normalized extension of file.
+ * @function
+ * @param  {string} filename File name.
+ * @return {string} Lowercase extension or null.
+ */
+BackgroundLoader.prototype.getExtension = function(filename) {
+    var pos = filename.lastIndexOf('.');
+    if (pos < 0) {
+        return null;
+    }
+    var extension = filename.substr(pos + 1).toLowerCase();
+    if (extension == 'jpeg') {
+        extension = 'jpg';
+    }
+    return extension;
+};
+
+
+/**
+ * Set transparency mode of read node by extension of its images.
+ * @function
+ * @param {string} read      Read node.
+ * @param {string} extension Extension of images.
+ */
+BackgroundLoader.prototype.setTransparencyMode = function(read, extension) {
+    var transparencyModeAttr = node.getAttr(
+        read, frame.current(), 'applyMatteToColor'
+    );
+    if (extension == 'png') {
+        transparencyModeAttr.setValue(BackgroundLoader.PNGTransparencyMode);
+    }
+    if (extension == 'tga') {
+        transparencyModeAttr.setValue(BackgroundLoader.TGATransparencyMode);
+    }
+    if (extension == 'sgi') {
+        transparencyModeAttr.setValue(BackgroundLoader.SGITransparencyMode);
+    }
+    if (extension == 'psd') {
+        transparencyModeAttr.setValue(BackgroundLoader.FlatPSDTransparencyMode);
+    }
+    if (extension == 'jpg') {
+        transparencyModeAttr.setValue(BackgroundLoader.LayeredPSDTransparencyMode);
+    }
+};
+
+
+/**
+ * Create drawings of element from files and expose them in column.
+ * @function
+ * @param {int}    elemId     Element ID.
+ * @param {string} columnName Column name.
+ * @param {array}  files      List of files.
+ * @param {int}    startFrame Frame of first drawing.
+ */
+BackgroundLoader.prototype.setDrawings = function(
+    elemId, columnName, files, startFrame
+) {
+    var timing, drawingFilePath, i;
+    if (files.length == 1) {
+        // Create a drawing drawing, 'true' indicate that the file exists.
+        Drawing.create(elemId, 1, true);
+        // Get the actual path, in tmp folder.
+        drawingFilePath = Drawing.filename(elemId, '1');
+        AyonHarmony.copyFile(files[0], drawingFilePath);
+        // Expose the image for the entire frame range.
+        for (i = 0; i <= frame.numberOf() - 1; ++i) {
+            timing = startFrame + i;
+            column.setEntry(columnName, 1, timing, '1');
+        }
+    } else {
+        // Create a drawing for each file.
+        for (i = 0; i <= files.length - 1; ++i) {
+            timing = startFrame + i;
+            // Create a drawing drawing, 'true' indicate that the file exists.
+            Drawing.create(elemId, timing, true);
+            // Get the actual path, in tmp folder.
+            drawingFilePath = Drawing.filename(elemId, timing.toString());
+            AyonHarmony.copyFile(files[i], drawingFilePath);
+
+            column.setEntry(columnName, 1, timing, timing.toString());
+        }
+    }
+};
+
+
+/**
+ * Import files as new read node.
+ * @function
+ * @param  {array}  args Arguments, see example.
+ * @return {string} Read node name or null.
+ *
+ * @example
+ * // Arguments are in following order:
+ * var args = [
+ *  root,       // parent node
+ *  files,      // list of files
+ *  name,       // name of the read node
+ *  startFrame  // frame of first drawing
+ * ];
+ */
+BackgroundLoader.prototype.importFiles = function(args) {
+    var root = args[0];
+    var files = args[1];
+    var name = args[2];
+    var startFrame = args[3];
+
+    var vectorFormat = null;
+    var extension = BackgroundLoader.prototype.getExtension(files[0]);
+    if (extension === null) {
+        return null;
+    }
+    if (extension == 'tvg') {
+        vectorFormat = 'TVG';
+        extension = 'SCAN'; // element.add() will use this.
+    }
+
+    var elemId = element.add(
+        name,
+        'BW',
+        scene.numberOfUnitsZ(),
+        extension.toUpperCase(),
+        vectorFormat
+    );
+    if (elemId == -1) {
+        // hum, unknown file type most likely -- let's skip it.
+        return null; // no read to add.
+    }
+
+    var uniqueColumnName = BackgroundLoader.prototype.getUniqueColumnName(name);
+    column.add(uniqueColumnName, 'DRAWING');
+    column.setElementIdOfDrawing(uniqueColumnName, elemId);
+
+    var read = node.add(root, name, 'READ', 0, 0, 0);
+    var transparencyAttr = node.getAttr(
+        read, frame.current(), 'READ_TRANSPARENCY'
+    );
+    var opacityAttr = node.getAttr(read, frame.current(), 'OPACITY');
+    transparencyAttr.setValue(true);
+    opacityAttr.setValue(true);
+
+    var alignmentAttr = node.getAttr(read, frame.current(), 'ALIGNMENT_RULE');
+    alignmentAttr.setValue('ASIS');
+
+    BackgroundLoader.prototype.setTransparencyMode(read, extension);
+
+    node.linkAttr(read, 'DRAWING.ELEMENT', uniqueColumnName);
+
+    BackgroundLoader.prototype.setDrawings(elemId, uniqueColumnName, files, startFrame);
+
+    var greenColor = new ColorRGBA(0, 255, 0, 255);
+    node.setColor(read, greenColor);
+
+    return read;
+};
+
+
+/**
+ * Replace files of existing read node.
+ * @function
+ * @param  {array} args Arguments, see example.
+ *
+ * @example
+ * // Arguments are in following order:
+ * var args = [
+ *  files,      // list of files
+ *  node,       // read node
+ *  startFrame  // frame of first drawing
+ * ];
+ */
+BackgroundLoader.prototype.replaceFiles = function(args) {
+    var files = args[0];
+    var _node = args[1];
+    var startFrame = args[2];
+
+    var _column = node.linkedColumn(_node, 'DRAWING.ELEMENT');
+    var elemId = column.getElementIdOfDrawing(_column);
+
+    // Delete existing drawings.
+    var timings = column.getDrawingTimings(_column);
+    for (var i = 0; i <= timings.length - 1; ++i) {
+        column.deleteDrawingAt(_column, parseInt(timings[i]));
+    }
+
+    var extension = BackgroundLoader.prototype.getExtension(files[0]);
+    if (extension === null) {
+        return;
+    }
+    BackgroundLoader.prototype.setTransparencyMode(_node, extension);
+
+    BackgroundLoader.prototype.setDrawings(elemId, _column, files, startFrame);
+
+    var greenColor = new ColorRGBA(0, 255, 0, 255);
+    node.setColor(_node, greenColor);
+};
+
+
+/**
+ * Set color of nodes by if they are up to date.
+ * @function
+ * @param {array} args Node and color name, 'red' or 'green'.
+ */
+BackgroundLoader.prototype.setColor = function(args) {
+    var _node = args[0];
+    if (args[1] == 'red') {
+        node.setColor(_node, new ColorRGBA(255, 0, 0, 255));
+    }
+    if (args[1] == 'green') {
+        node.setColor(_node, new ColorRGBA(0, 255, 0, 255));
+    }
+};
+
+// add self to AYON Loaders
+AyonHarmony.Loaders.BackgroundLoader = new BackgroundLoader();
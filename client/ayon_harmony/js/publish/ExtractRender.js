@@ -0,0 +1,30 @@
+/* global AyonHarmony:writable, include */
+// ***************************************************************************
+// *                           ExtractRender                                 *
+// ***************************************************************************
+
+
+// check if AyonHarmony is defined and if not, load it.
+if (typeof AyonHarmony === 'undefined') {
+    var AYON_HARMONY_JS = System.getenv('AYON_HARMONY_JS') + '/AyonHarmony.js';
+    include(AYON_HARMONY_JS.replace(/\\/g, "/"));
+}
+
+/**
+ * @namespace
+ * @classdesc Code for extracting local renders.
+ */
+var ExtractRender = function() {};
+
+
+/**
+ * Set path where write node renders its images.
+ * @function
+ * @param {array} args Write node and path with file name prefix.
+ */
+ExtractRender.prototype.setOutputPath = function(args) {
+    node.setTextAttr(args[0], 'DRAWING_NAME', 1, args[1]);
+};
+
+// add self to AYON Publish
+AyonHarmony.Publish.ExtractRender = new ExtractRender();
@@ -0,0 +1,52 @@
+/* global AyonHarmony:writable, include */
+// ***************************************************************************
+// *                       ExtractSourceForReview                            *
+// ***************************************************************************
+
+
+// check if AyonHarmony is defined and if not, load it.
+if (typeof AyonHarmony === 'undefined') {
+    var AYON_HARMONY_JS = System.getenv('AYON_HARMONY_JS') + '/AyonHarmony.js';
+    include(AYON_HARMONY_JS.replace(/\\/g, "/"));
+}
+
+/**
+ * @namespace
+ * @classdesc Code for exporting review from Display node.
+ */
+var ExtractSourceForReview = function() {};
+
+
+/**
+ * Export content of Display node as QuickTime movie.
+ * Frame range and resolution are taken from scene.
+ * @function
+ * @param {array} args Path of exported movie and name of Display node.
+ */
+ExtractSourceForReview.prototype.exportToQuicktime = function(args) {
+    var codec = 'openH264';
+    var startFrame = -1; // take from timeline
+    var endFrame = -1; // take from timeline
+    var withSound = true;
+    var resX = -1; // take from scene
+    var resY = -1;
+    var saveTo = args[0];
+    var displayToRender = args[1];
+    var generateThumbnail = false;
+    var thumbnailFrame = 0;
+    exporter.exportToQuicktime(
+        codec,
+        startFrame,
+        endFrame,
+        withSound,
+        resX,
+        resY,
+        saveTo,
+        displayToRender,
+        generateThumbnail,
+        thumbnailFrame
+    );
+};
+
+// add self to AYON Publish
+AyonHarmony.Publish.ExtractSourceForReview = new ExtractSourceForReview();
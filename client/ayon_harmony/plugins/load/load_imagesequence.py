@@ -108,26 +108,19 @@ class ImageSequenceLoader(load.LoaderPlugin):
                 ).replace("\\", "/")
             )
 
-        harmony.send(
-            {
-                "function": f"AyonHarmony.Loaders.{self_name}.replaceFiles",
-                "args": [files, node, 1]
-            }
-        )
-
         # Colour node.
         if is_representation_from_latest(repre_entity):
-            harmony.send(
-                {
-                    "function": "AyonHarmony.setColor",
-                    "args": [node, [0, 255, 0, 255]]
-                })
+            color = [0, 255, 0, 255]
         else:
-            harmony.send(
-                {
-                    "function": "AyonHarmony.setColor",
-                    "args": [node, [255, 0, 0, 255]]
-                })
+            color = [255, 0, 0, 255]
+
+        harmony.send_batch([
+            {
+                "function": f"AyonHarmony.Loaders.{self_name}.replaceFiles",
+                "args": [files, node, 1]
+            },
+            {"function": "AyonHarmony.setColor", "args": [node, color]},
+        ])
 
         harmony.imprint(
             node, {"representation": repre_entity["id"]}
@@ -15,11 +15,13 @@ class CollectScene(pyblish.api.ContextPlugin):
 
     def process(self, context):
         """Plugin entry point."""
-        result = harmony.send(
-            {
-                "function": "AyonHarmony.getSceneSettings",
-                "args": []}
-        )["result"]
+        result, all_nodes, all_write_nodes, version = harmony.send_batch([
+            {"function": "AyonHarmony.getSceneSettings", "args": []},
+            {"function": "node.subNodes", "args": ["Top"]},
+            # collect all write nodes to be able disable them in Deadline
+            {"function": "node.getNodes", "args": ["WRITE"]},
+            {"function": "AyonHarmony.getVersion", "args": []},
+        ])
 
         context.data["applicationPath"] = result[0]
         context.data["scenePath"] = os.path.join(
@@ -47,22 +49,8 @@ class CollectScene(pyblish.api.ContextPlugin):
         context.data["frameEnd"] = int(frames_count) + \
             context.data["frameStart"] - 1
 
-        all_nodes = harmony.send(
-            {"function": "node.subNodes", "args": ["Top"]}
-        )["result"]
-
         context.data["allNodes"] = all_nodes
-
-        # collect all write nodes to be able disable them in Deadline
-        all_write_nodes = harmony.send(
-            {"function": "node.getNodes", "args": ["WRITE"]}
-        )["result"]
-
         context.data["all_write_nodes"] = all_write_nodes
-
-        result = harmony.send(
-            {
-                "function": "AyonHarmony.getVersion",
-                "args": []}
-        )["result"]
-        context.data["harmonyVersion"] = "{}.{}".format(result[0], result[1])
+        context.data["harmonyVersion"] = "{}.{}".format(
+            version[0], version[1]
+        )
@@ -40,23 +40,16 @@ class ExtractRender(pyblish.api.InstancePlugin):
 
         # Set output path to temp folder.
         path = tempfile.mkdtemp()
-        sig = harmony.signature()
-        func = """function %s(args)
-        {
-            node.setTextAttr(args[0], "DRAWING_NAME", 1, args[1]);
-        }
-        %s
-        """ % (sig, sig)
-
         node = instance.data["setMembers"][0]
         filename = instance.data["name"]
         # Add underscode if basename ends with digits to make sure frame
         #   number is separated from the name.
         if filename[-1].isdigit():
             filename += "_"
+        self_name = self.__class__.__name__
         harmony.send(
             {
-                "function": func,
+                "function": f"AyonHarmony.Publish.{self_name}.setOutputPath",
                 "args": [node, f"{path}/{filename}"]
             }
         )
@@ -37,40 +37,13 @@ class ExtractSourceForReview(publish.Extractor):
         filepath = os.path.join(staging_dir, file_name)
         self.log.info(f"Exporting to {filepath}")
 
-        sig = harmony.signature()
-
         display_node_name = instance.data["display_node_name"]
-
-        func = """function %s(args)
-        {
-            var codec = "openH264";
-            var startFrame = -1; // take from timeline
-            var endFrame = -1; // take from timeline
-            var withSound = true;
-            var resX = -1; //take from scene
-            var resY = -1;
-            var saveTo = args[0];
-            var displayToRender = args[1];
-            var generateThumbnail = false;
-            var thumbnailFrame = 0;
-            exporter.exportToQuicktime(
-                codec,
-                startFrame,
-                endFrame,
-                withSound,
-                resX,
-                resY,
-                saveTo,
-                displayToRender,
-                generateThumbnail,
-                thumbnailFrame
-            )
-        }
-        %s
-        """ % (sig, sig)
+        self_name = self.__class__.__name__
         harmony.send(
             {
-                "function": func,
+                "function": (
+                    f"AyonHarmony.Publish.{self_name}.exportToQuicktime"
+                ),
                 "args": [filepath, display_node_name]
             }
         )
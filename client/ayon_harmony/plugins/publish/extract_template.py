@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Extract template."""
 import os
-import shutil
 
 from ayon_core.pipeline import publish
 import ayon_harmony.api as harmony
@@ -28,12 +27,12 @@ class ExtractTemplate(publish.Extractor):
         )
 
         # Prep representation.
-        os.chdir(staging_dir)
-        shutil.make_archive(
-            f"{instance.name}",
-            "zip",
+        stats = harmony.zip_directory(
             os.path.join(staging_dir, "harmony"),
+            os.path.join(staging_dir, f"{instance.name}.zip"),
+            instance.context.data["project_settings"],
         )
+        self.log.info(f"Archive statistics: {stats.summary()}")
 
         representation = {
             "name": "tpl",
@@ -3,9 +3,9 @@
 import os
 import platform
 import shutil
-from zipfile import ZipFile
 
 from ayon_core.pipeline import publish
+import ayon_harmony.api as harmony
 
 
 class ExtractWorkfile(publish.Extractor):
@@ -29,16 +29,12 @@ class ExtractWorkfile(publish.Extractor):
         shutil.copytree(src, filepath)
 
         # Prep representation.
-        os.chdir(staging_dir)
-        shutil.make_archive(
-            f"{instance.name}",
-            "zip",
-            os.path.join(staging_dir, f"{instance.name}.tpl")
+        stats = harmony.zip_directory(
+            os.path.join(staging_dir, f"{instance.name}.tpl"),
+            os.path.join(staging_dir, f"{instance.name}.zip"),
+            instance.context.data["project_settings"],
         )
-        # Check if archive is ok
-        with ZipFile(os.path.basename(f"{instance.name}.zip")) as zr:
-            if zr.testzip() is not None:
-                raise Exception("File archive is corrupted.")
+        self.log.info(f"Archive statistics: {stats.summary()}")
 
         representation = {
             "name": "tpl",
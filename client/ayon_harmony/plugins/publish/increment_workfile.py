@@ -8,6 +8,9 @@ from ayon_core.pipeline.publish import get_errored_plugins_from_context
 from ayon_core.pipeline.workfile import save_next_version
 from ayon_core.host.interfaces import SaveWorkfileOptionalData
 
+import ayon_harmony.api as harmony
+from ayon_harmony.api import archive
+
 
 class IncrementWorkfile(pyblish.api.InstancePlugin):
     """Increment the current workfile.
@@ -52,7 +55,17 @@ class IncrementWorkfile(pyblish.api.InstancePlugin):
         )
         new_scene_path = host.get_current_workfile()
 
-        # Mark unzipped temp workfile to be deleted
-        instance.context.data["cleanupFullPaths"].append(current_local_dir)
+        # Folder may be still zipped in background after the save
+        #   in ExtractSaveScene, it can't be removed before it finishes.
+        self.log.debug(f"Waiting for zipping of {current_local_dir}")
+        harmony.wait_for_zip_and_move(source=current_local_dir)
+
+        # Mark unzipped temp workfile to be deleted, with its manifest
+        #   which would be left in local cache otherwise.
+        cleanup_paths = instance.context.data["cleanupFullPaths"]
+        cleanup_paths.append(current_local_dir)
+        manifest_path = archive.get_manifest_path(current_local_dir)
+        if os.path.exists(manifest_path):
+            cleanup_paths.append(manifest_path)
 
         self.log.info("Incremented workfile to: {}".format(new_scene_path))
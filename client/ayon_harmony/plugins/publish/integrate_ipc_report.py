@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Write report of requests sent to Harmony during publishing."""
+import os
+import json
+from datetime import datetime
+
+import pyblish.api
+
+import ayon_harmony.api as harmony
+
+
+class IntegrateIPCReport(pyblish.api.ContextPlugin):
+    """Dump statistics of requests sent to Harmony as JSON report.
+
+    Report is written only when `AYON_HARMONY_IPC_REPORT_DIR` environment
+    variable is set, to that directory. Statistics are reset afterwards so
+    each report covers requests since the previous one.
+    """
+
+    label = "IPC Report"
+    order = pyblish.api.IntegratorOrder + 10
+    hosts = ["harmony"]
+    settings_category = "harmony"
+
+    # Settings
+    log_summary = False
+    summary_count = 10
+
+    def process(self, context):
+        stats = harmony.ipc_stats()
+        if not stats:
+            self.log.debug("No requests to Harmony were recorded.")
+            return
+
+        report_dir = os.getenv("AYON_HARMONY_IPC_REPORT_DIR")
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = os.path.join(
+                report_dir, f"ipc_report_{timestamp}.json"
+            )
+            with open(report_path, "w") as stream:
+                json.dump(
+                    {
+                        "currentFile": context.data.get("currentFile"),
+                        "calls": stats,
+                    },
+                    stream,
+                    indent=4
+                )
+            self.log.info(f"IPC report written to '{report_path}'")
+
+        if self.log_summary:
+            lines = ["Slowest requests to Harmony (total | calls | p95):"]
+            for name, item in list(stats.items())[:self.summary_count]:
+                lines.append(
+                    f"{item['total_ms']:10.1f} ms | {item['calls']:5} | "
+                    f"{item['p95_ms']:8.1f} ms | {name}"
+                )
+            self.log.info("\n".join(lines))
+
+        harmony.reset_ipc_stats()
@@ -3,6 +3,7 @@ from ayon_server.settings import BaseSettingsModel, SettingsField
 from .imageio import HarmonyImageIOModel
 from .creator_plugins import HarmonyCreatePlugins
 from .publish_plugins import HarmonyPublishPlugins
+from .workfile import HarmonyWorkfileModel
 
 
 class HarmonySettings(BaseSettingsModel):
@@ -20,6 +21,10 @@ class HarmonySettings(BaseSettingsModel):
         default_factory=HarmonyPublishPlugins,
         title="Publish plugins"
     )
+    workfile: HarmonyWorkfileModel = SettingsField(
+        default_factory=HarmonyWorkfileModel,
+        title="Workfile archives"
+    )
 
 
 DEFAULT_HARMONY_SETTING = {
@@ -113,5 +118,20 @@ DEFAULT_HARMONY_SETTING = {
             "replace_pngs": True,
             "exr_compression": "ZIP"
         },
+        "IntegrateIPCReport": {
+            "enabled": False,
+            "log_summary": False,
+            "summary_count": 10
+        },
+    },
+    "workfile": {
+        "compression_level": 6,
+        "compression_workers": 0,
+        "extract_workers": 0,
+        "store_extensions": ["png", "jpg", "jpeg", "tvg"],
+        "detect_incompressible": True,
+        "paranoid_verification": False,
+        "local_cache_size_limit": 100,
+        "prewarm_local_scene": True
     }
 }
@@ -110,6 +110,25 @@ class ExtractConvertToEXRModel(BaseSettingsModel):
     )
 
 
+class IntegrateIPCReportModel(BaseSettingsModel):
+    """Report requests sent to Harmony during publishing.
+
+    JSON report is written only to directory set in
+    `AYON_HARMONY_IPC_REPORT_DIR` environment variable.
+    """
+    enabled: bool = SettingsField(False, title="Enabled")
+    log_summary: bool = SettingsField(
+        False,
+        title="Log summary",
+        description="Log slowest requests to publisher report",
+    )
+    summary_count: int = SettingsField(
+        10,
+        title="Number of requests in summary",
+        ge=1,
+    )
+
+
 class HarmonyPublishPlugins(BaseSettingsModel):
 
     CollectPalettes: CollectPalettesPlugin = SettingsField(
@@ -136,3 +155,8 @@ class HarmonyPublishPlugins(BaseSettingsModel):
         default_factory=ExtractConvertToEXRModel,
         title="Extract Convert To EXR"
     )
+
+    IntegrateIPCReport: IntegrateIPCReportModel = SettingsField(
+        default_factory=IntegrateIPCReportModel,
+        title="Integrate IPC Report"
+    )
@@ -0,0 +1,74 @@
+from ayon_server.settings import BaseSettingsModel, SettingsField
+
+
+class HarmonyWorkfileModel(BaseSettingsModel):
+    """Zipping of Harmony scene folders to workfiles and published files."""
+
+    compression_level: int = SettingsField(
+        6,
+        ge=0,
+        le=9,
+        title="Compression level",
+        description=(
+            "Deflate compression level, 1 is the fastest, 9 gives smallest"
+            " files, 0 stores data without compression."
+        ),
+    )
+    compression_workers: int = SettingsField(
+        0,
+        ge=0,
+        title="Compression threads",
+        description="Number of threads compressing files, 0 uses all CPUs.",
+    )
+    extract_workers: int = SettingsField(
+        0,
+        ge=0,
+        title="Extraction threads",
+        description=(
+            "Number of threads extracting files when workfile is opened,"
+            " 0 uses all CPUs."
+        ),
+    )
+    store_extensions: list[str] = SettingsField(
+        default_factory=lambda: ["png", "jpg", "jpeg", "tvg"],
+        title="Store without compression",
+        description=(
+            "Extensions of already compressed files which are stored"
+            " in archives as they are."
+        ),
+    )
+    detect_incompressible: bool = SettingsField(
+        True,
+        title="Store incompressible files",
+        description=(
+            "Store files without compression when compressing their"
+            " beginning doesn't make it smaller."
+        ),
+    )
+    paranoid_verification: bool = SettingsField(
+        False,
+        title="Paranoid verification",
+        description=(
+            "Read whole archive again after it is written and check all"
+            " files. CRC of files is always checked while they are"
+            " compressed, this roughly doubles time of saving big scenes."
+        ),
+    )
+    local_cache_size_limit: int = SettingsField(
+        100,
+        ge=0,
+        title="Local scenes size limit (GB)",
+        description=(
+            "Least recently used scenes unzipped to local disk are removed"
+            " when their size exceeds the limit. Scenes with changes not"
+            " saved to workfile are kept. 0 disables the limit."
+        ),
+    )
+    prewarm_local_scene: bool = SettingsField(
+        True,
+        title="Pre-warm local scene on launch",
+        description=(
+            "Start unzipping workfile to local disk in launch hook, while"
+            " Harmony launch is still being prepared."
+        ),
+    )
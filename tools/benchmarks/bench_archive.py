@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Benchmark wall time of writing scene archives.
+
+Creates synthetic scene folder (compressible drawings, incompressible
+PNG images and scene XML) and archives it with `shutil.make_archive`, with
+`write_scene_archive` compressing serially (1 thread) and in parallel,
+and incrementally with manifest of previous archive after one drawing
+changed. `archive.py` has no dependencies, AYON is not required.
+
+Example:
+    $ python tools/benchmarks/bench_archive.py --size 512 --workers 4
+
+"""
+import os
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import importlib.util
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_PY = os.path.join(
+    os.path.dirname(os.path.dirname(CURRENT_DIR)),
+    "client", "ayon_harmony", "api", "archive.py"
+)
+
+
+def _import_archive():
+    spec = importlib.util.spec_from_file_location("archive", ARCHIVE_PY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+archive = _import_archive()
+
+
+def create_scene(root, size_mb, file_count):
+    """Create synthetic scene folder.
+
+    Three quarters of the size are compressible drawings, the rest are
+    random PNG images which are stored without compression.
+
+    Args:
+        root (str): Scene folder to create.
+        size_mb (int): Approximate size of scene in megabytes.
+        file_count (int): Number of drawings and images.
+
+    Returns:
+        list[str]: Paths to drawings.
+
+    """
+    elements_dir = os.path.join(root, "elements")
+    os.makedirs(elements_dir)
+    file_size = max(1, size_mb * 1024 * 1024 // file_count)
+    drawings = []
+    for idx in range(file_count):
+        if idx % 4 == 3:
+            path = os.path.join(elements_dir, f"image_{idx:04}.png")
+            data = os.urandom(file_size)
+        else:
+            path = os.path.join(elements_dir, f"drawing_{idx:04}.tvg")
+            # Each random block is repeated 3 times, compresses roughly
+            #   to one third.
+            data = b"".join(
+                os.urandom(341) * 3 for _ in range(file_size // 1023 + 1)
+            )[:file_size]
+            drawings.append(path)
+        with open(path, "wb") as stream:
+            stream.write(data)
+
+    with open(os.path.join(root, "scene.xstage"), "w") as stream:
+        stream.write("<scene>\n")
+        for idx in range(file_count):
+            stream.write(f'  <element id="{idx}" name="drawing_{idx}"/>\n')
+        stream.write("</scene>\n")
+    return drawings
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--size", type=int, default=512,
+        help="Approximate size of scene in megabytes."
+    )
+    parser.add_argument(
+        "--files", type=int, default=400,
+        help="Number of drawings and images in scene."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of compressing threads of parallel run."
+    )
+    parser.add_argument(
+        "--level", type=int, default=archive.DEFAULT_COMPRESSION_LEVEL,
+        help="Deflate compression level."
+    )
+    args = parser.parse_args()
+
+    policy = archive.CompressionPolicy(store_extensions=["png"])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scene_dir = os.path.join(tmp_dir, "scene")
+        drawings = create_scene(scene_dir, args.size, args.files)
+
+        results = []
+        duration, _ = _timed(
+            shutil.make_archive,
+            os.path.join(tmp_dir, "make_archive"),
+            "zip",
+            scene_dir,
+        )
+        results.append(
+            ("shutil.make_archive", duration, "make_archive.zip")
+        )
+
+        for label, workers in (
+            ("serial (1 thread)", 1),
+            (f"parallel ({args.workers} threads)", args.workers),
+        ):
+            archive_name = f"workers_{workers}.zip"
+            duration, files = _timed(
+                archive.write_scene_archive,
+                scene_dir,
+                os.path.join(tmp_dir, archive_name),
+                compression_level=args.level,
+                workers=workers,
+                policy=policy,
+            )
+            results.append((label, duration, archive_name))
+
+        # Change one drawing and write archive again with manifest.
+        with open(drawings[0], "ab") as stream:
+            stream.write(b"changed")
+        manifest = {
+            "files": files,
+            "archive": {"path": os.path.join(tmp_dir, archive_name)},
+        }
+        duration, _ = _timed(
+            archive.write_scene_archive,
+            scene_dir,
+            os.path.join(tmp_dir, "incremental.zip"),
+            manifest=manifest,
+            compression_level=args.level,
+            workers=args.workers,
+            policy=policy,
+        )
+        results.append(
+            ("incremental (1 changed)", duration, "incremental.zip")
+        )
+
+        print(f"{'archive':<26}{'seconds':>10}{'MB':>10}")
+        for label, duration, archive_name in results:
+            archive_path = os.path.join(tmp_dir, archive_name)
+            with zipfile.ZipFile(archive_path) as zip_file:
+                if zip_file.testzip() is not None:
+                    raise RuntimeError(f"Archive '{archive_name}' is broken.")
+            size = os.path.getsize(archive_path) / (1024 * 1024)
+            print(f"{label:<26}{duration:>10.2f}{size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
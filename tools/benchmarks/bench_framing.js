@@ -0,0 +1,203 @@
+/* eslint-env node */
+// ***************************************************************************
+// *                     Harmony client framing benchmark                    *
+// ***************************************************************************
+//
+// Runs `Client` from TB_sceneOpened.js in Node.js with minimal stand-ins for
+// Qt classes it uses for framing (QByteArray, QTextCodec, QTcpSocket) and
+// measures how fast received frames are decoded and replies encoded.
+// Data are fed in chunks of socket reads, frames are `AH` framed as sent by
+// Python `Server`. Qt classes in Harmony are native, so absolute numbers
+// differ, compare results before and after a change of framing code.
+//
+// Usage:
+//   node tools/benchmarks/bench_framing.js [sizes in kB...]
+//
+// Example:
+//   node tools/benchmarks/bench_framing.js 1 64 1024 8192
+
+var fs = require('fs');
+var path = require('path');
+var vm = require('vm');
+
+var CLIENT_JS = path.join(
+    __dirname, '..', '..', 'client', 'ayon_harmony', 'api', 'TB_sceneOpened.js'
+);
+// Size of data returned by single socket read.
+var READ_CHUNK = 64 * 1024;
+// Total kilobytes sent for each payload size.
+var VOLUME = 32 * 1024;
+
+
+/**
+ * Byte array with subset of QByteArray interface used by the client.
+ * @class
+ * @param {Buffer} data Initial data.
+ */
+function QByteArray(data) {
+    this.data = data || Buffer.alloc(0);
+}
+
+QByteArray.toBuffer = function(value) {
+    if (typeof value === 'string') {
+        return Buffer.from(value, 'latin1');
+    }
+    return value.data;
+};
+
+QByteArray.prototype.append = function(value) {
+    this.data = Buffer.concat([this.data, QByteArray.toBuffer(value)]);
+    return this;
+};
+
+QByteArray.prototype.prepend = function(value) {
+    this.data = Buffer.concat([QByteArray.toBuffer(value), this.data]);
+    return this;
+};
+
+QByteArray.prototype.size = function() {
+    return this.data.length;
+};
+
+QByteArray.prototype.at = function(index) {
+    // Qt returns signed char.
+    return this.data.readInt8(index);
+};
+
+QByteArray.prototype.mid = function(offset, length) {
+    var end = length === undefined ? undefined : offset + length;
+    return new QByteArray(this.data.subarray(offset, end));
+};
+
+QByteArray.prototype.remove = function(offset, length) {
+    this.data = Buffer.concat([
+        this.data.subarray(0, offset), this.data.subarray(offset + length)
+    ]);
+    return this;
+};
+
+
+/**
+ * Create client from TB_sceneOpened.js connected to fake socket.
+ * @return {object} Client and list of data written to socket.
+ */
+function createClient() {
+    var written = [];
+    var context = {
+        Buffer: Buffer,
+        JSON: JSON,
+        QByteArray: QByteArray,
+        System: {getenv: function() { return ''; }},
+        MessageLog: {trace: function() {}},
+        QTextCodec: {
+            codecForName: function() {
+                return {
+                    toUnicode: function(bytes) {
+                        return bytes.data.toString('utf8');
+                    },
+                    fromUnicode: function(text) {
+                        return new QByteArray(Buffer.from(text, 'utf8'));
+                    }
+                };
+            }
+        },
+        QTcpSocket: function() {
+            this.connected = {connect: function() {}};
+            this.disconnected = {connect: function() {}};
+            this.write = function(bytes) { written.push(bytes); };
+        },
+        QTimer: function() {},
+        include: function() {}
+    };
+    vm.createContext(context);
+    vm.runInContext(
+        fs.readFileSync(CLIENT_JS, 'utf8') +
+        '\nthis.Client = Client;' +
+        '\nvar benchmark = {echo: function(args) { return args.length; }};',
+        context
+    );
+    return {client: new context.Client(), written: written};
+}
+
+
+/**
+ * Frame message as Python `Server` does.
+ * @param  {object} message Message to send.
+ * @return {Buffer} Framed message.
+ */
+function frame(message) {
+    var payload = Buffer.from(JSON.stringify(message), 'utf8');
+    var header = Buffer.alloc(6);
+    header.write('AH');
+    header.writeUInt32BE(payload.length, 2);
+    return Buffer.concat([header, payload]);
+}
+
+
+/**
+ * Feed frames with payload of given size to client.
+ * @param  {int} sizeKb Payload size in kilobytes.
+ * @return {object} Round trips, payload size in bytes and seconds.
+ */
+function runSize(sizeKb) {
+    var created = createClient();
+    var client = created.client;
+    var chunk = 'žluťoučký kůň ';
+    var chunkSize = Buffer.byteLength(chunk, 'utf8');
+    var payload = chunk.repeat(Math.floor(sizeKb * 1024 / chunkSize));
+    var count = Math.max(1, Math.floor(VOLUME / sizeKb));
+
+    var frames = [];
+    for (var i = 0; i < count; ++i) {
+        frames.push(frame({
+            message_id: i, 'function': 'benchmark.echo', args: [payload]
+        }));
+    }
+    var stream = Buffer.concat(frames);
+
+    var start = process.hrtime.bigint();
+    for (var offset = 0; offset < stream.length; offset += READ_CHUNK) {
+        var read = stream.subarray(offset, offset + READ_CHUNK);
+        client.socket.readAll = function() { return new QByteArray(read); };
+        client.onReadyRead();
+    }
+    var seconds = Number(process.hrtime.bigint() - start) / 1e9;
+    if (created.written.length != count) {
+        throw new Error(
+            'Expected ' + count + ' replies, got ' + created.written.length
+        );
+    }
+    return {
+        count: count,
+        payloadSize: Buffer.byteLength(payload, 'utf8'),
+        seconds: seconds
+    };
+}
+
+
+function pad(value, width) {
+    return String(value).padStart(width);
+}
+
+
+function main() {
+    var sizes = process.argv.slice(2).map(Number);
+    if (sizes.length == 0) {
+        sizes = [1, 64, 1024, 8192];
+    }
+    console.log(pad('size kB', 8) + pad('trips', 8) + pad('trips/s', 10) +
+                pad('MB/s', 10));
+    sizes.forEach(function(sizeKb) {
+        var result = runSize(sizeKb);
+        // Payload is decoded and sent back in reply.
+        var megabytes = 2 * result.count * result.payloadSize / (1024 * 1024);
+        console.log(
+            pad(sizeKb, 8) + pad(result.count, 8) +
+            pad((result.count / result.seconds).toFixed(1), 10) +
+            pad((megabytes / result.seconds).toFixed(1), 10)
+        );
+    });
+}
+
+
+main();
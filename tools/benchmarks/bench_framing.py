@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Benchmark throughput of Python side of Harmony message framing.
+
+Sends requests of growing size from `Server` to `StandInClient`, which
+decodes them and sends them back as replies (`AH` framing in both
+directions), and reports round trips per second and megabytes per second.
+Harmony side of the framing is measured by `bench_framing.js`.
+
+Example:
+    $ python tools/benchmarks/bench_framing.py --sizes 1 64 1024 8192
+
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(CURRENT_DIR)), "client"
+)
+sys.path.insert(0, CLIENT_DIR)
+
+from ayon_harmony.api.server import Server  # noqa: E402
+
+from standin import StandInClient  # noqa: E402
+
+# Payload sizes in kilobytes.
+DEFAULT_SIZES = (1, 64, 1024, 8192)
+# Total kilobytes sent for each payload size.
+DEFAULT_VOLUME = 32 * 1024
+
+
+def run_size(server, size_kb, volume_kb):
+    """Send requests with payload of given size.
+
+    Args:
+        server (Server): Running server with connected client.
+        size_kb (int): Payload size in kilobytes.
+        volume_kb (int): Total kilobytes to send.
+
+    Returns:
+        tuple[int, int, float]: Number of round trips, encoded payload size
+            in bytes and seconds the round trips took.
+
+    """
+    # Multi-byte characters to exercise UTF-8 decoding on both sides.
+    chunk = "žluťoučký kůň "
+    chunk_size = len(chunk.encode("utf-8"))
+    payload = chunk * (size_kb * 1024 // chunk_size)
+    count = max(1, volume_kb // size_kb)
+    start = time.perf_counter()
+    for _ in range(count):
+        server.send({"function": "benchmark.echo", "args": [payload]})
+    return count, len(payload.encode("utf-8")), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="Payload sizes in kilobytes."
+    )
+    parser.add_argument(
+        "--volume", type=int, default=DEFAULT_VOLUME,
+        help="Kilobytes sent for each payload size."
+    )
+    args = parser.parse_args()
+
+    port = random.randrange(49152, 65535)
+    server = Server(port)
+    server.start()
+    client = StandInClient(port)
+    client.start()
+    try:
+        print(f"{'size kB':>8}{'trips':>8}{'trips/s':>10}{'MB/s':>10}")
+        for size_kb in args.sizes:
+            count, payload_size, duration = run_size(
+                server, size_kb, args.volume
+            )
+            # Payload travels to the client and back in reply.
+            megabytes = 2 * count * payload_size / (1024 * 1024)
+            print(
+                f"{size_kb:>8}{count:>8}"
+                f"{count / duration:>10.1f}{megabytes / duration:>10.1f}"
+            )
+    finally:
+        client.stop()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
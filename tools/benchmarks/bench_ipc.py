@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""Benchmark host code paths against headless stand-in of Harmony.
+
+Starts `Server` and `StandInClient` answering from synthetic scenes and
+measures host code users wait for: listing containers, collecting scene,
+creating render layer and loading/updating image sequence, next to low
+level helpers. Harmony is not required, `ayon_core` and `pyblish` have to
+be importable (run it from AYON development environment). Only lookups
+done on AYON server (representation path, latest version) are replaced.
+
+Example:
+    $ python tools/benchmarks/bench_ipc.py --sizes 10 100 1000 --latency 0.001
+
+"""
+import os
+import sys
+import time
+import types
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from unittest import mock
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(CURRENT_DIR)), "client"
+)
+PLUGINS_DIR = os.path.join(CLIENT_DIR, "ayon_harmony", "plugins")
+sys.path.insert(0, CLIENT_DIR)
+
+import pyblish.api  # noqa: E402
+
+from ayon_harmony.api import lib, pipeline  # noqa: E402
+from ayon_harmony.api.server import Server  # noqa: E402
+
+from standin import StandInClient, SceneModel  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000)
+IMPRINT_COUNT = 50
+SEQUENCE_LENGTH = 10
+
+
+def _import_plugin_module(*parts):
+    path = os.path.join(PLUGINS_DIR, *parts)
+    name = os.path.splitext(parts[-1])[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class HostPlugins:
+    """Host plugins prepared to run without AYON server.
+
+    Subclasses keep names of original plugins, those are used to call
+    their JavaScript functions in Harmony.
+
+    Args:
+        sequence_dir (str): Directory with image sequence to load.
+
+    """
+
+    def __init__(self, sequence_dir):
+        collect_scene = _import_plugin_module("publish", "collect_scene.py")
+        self.render_layers = _import_plugin_module(
+            "create", "create_render_layers.py"
+        )
+        self.load_imagesequence = _import_plugin_module(
+            "load", "load_imagesequence.py"
+        )
+        filepath = os.path.join(sequence_dir, "render.0001.png")
+
+        class CreateRenderLayer(self.render_layers.CreateRenderLayer):
+            log = logging.getLogger("CreateRenderLayer")
+
+            def __init__(self):
+                self.create_context = types.SimpleNamespace(instances=[])
+
+        class ImageSequenceLoader(
+            self.load_imagesequence.ImageSequenceLoader
+        ):
+            def __init__(self):
+                pass
+
+            def filepath_from_context(self, context):
+                return filepath
+
+        self.collect_scene = collect_scene.CollectScene()
+        self.create_render_layer = CreateRenderLayer()
+        self.image_sequence_loader = ImageSequenceLoader()
+        self.loaded_node = None
+
+
+def _create_sequence(directory):
+    for frame in range(1, SEQUENCE_LENGTH + 1):
+        path = os.path.join(directory, f"render.{frame:04}.png")
+        with open(path, "wb"):
+            pass
+
+
+def _get_load_context(idx=0):
+    return {
+        "folder": {"name": "sh010"},
+        "product": {"name": "renderMain"},
+        "representation": {"id": f"{idx:032x}"},
+    }
+
+
+def _list_top_names(plugins):
+    lib.get_all_top_names()
+
+
+def _get_scene_data_cold(plugins):
+    lib.invalidate_scene_data()
+    lib.get_scene_data()
+
+
+def _get_scene_data_cached(plugins):
+    lib.get_scene_data()
+
+
+def _read_node(plugins):
+    lib.read("Top/layer_0000")
+
+
+def _imprint_many(plugins):
+    scene_data = lib.get_scene_data()
+    lib.imprint_many({
+        node_id: {"benchmark": time.monotonic()}
+        for node_id in list(scene_data)[:IMPRINT_COUNT]
+    })
+
+
+def _list_containers(plugins):
+    list(pipeline.ls())
+
+
+def _collect_scene(plugins):
+    context = pyblish.api.Context()
+    context.data.update({
+        "frameStart": 1001,
+        "frameEnd": 1100,
+        "handleStart": 0,
+    })
+    plugins.collect_scene.process(context)
+
+
+def _create_render_layer(plugins):
+    # Harmony part of 'create': attribute definitions, nodes and imprint.
+    creator = plugins.create_render_layer
+    group_info = plugins.render_layers.get_group_infos()[0]
+    instance_data = {"productName": "renderMain", "variant": "Main"}
+    node = creator.product_impl(
+        "renderMain",
+        instance_data,
+        {"group_id": group_info.color, "render_target": "local"},
+    )
+    lib.imprint(node, instance_data)
+
+
+def _load_image_sequence(plugins):
+    plugins.loaded_node = plugins.image_sequence_loader.load(
+        _get_load_context()
+    )
+
+
+def _update_image_sequence(plugins):
+    if plugins.loaded_node is None:
+        _load_image_sequence(plugins)
+    container = {"nodes": [plugins.loaded_node]}
+    with mock.patch.object(
+        plugins.load_imagesequence,
+        "is_representation_from_latest",
+        return_value=True,
+    ):
+        plugins.image_sequence_loader.update(
+            container, _get_load_context(1)
+        )
+
+
+BENCHMARKS = (
+    ("top names", _list_top_names),
+    ("scene data (cold)", _get_scene_data_cold),
+    ("scene data (cached)", _get_scene_data_cached),
+    ("read node", _read_node),
+    (f"imprint {IMPRINT_COUNT} nodes", _imprint_many),
+    ("pipeline.ls", _list_containers),
+    ("CollectScene", _collect_scene),
+    ("CreateRenderLayer", _create_render_layer),
+    ("load image sequence", _load_image_sequence),
+    ("update image sequence", _update_image_sequence),
+)
+
+
+def run_benchmark(func, plugins, client, repeat):
+    """Run benchmark function multiple times.
+
+    Args:
+        func (Callable): Benchmarked function.
+        plugins (HostPlugins): Host plugins passed to the function.
+        client (StandInClient): Client answering the requests.
+        repeat (int): How many times the function is called.
+
+    Returns:
+        tuple[float, float]: Median duration in milliseconds and average
+            number of requests per call.
+
+    """
+    durations = []
+    requests_count = client.requests_count
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(plugins)
+        durations.append((time.perf_counter() - start) * 1000)
+    requests = (client.requests_count - requests_count) / repeat
+    return statistics.median(durations), requests
+
+
+def run_scene(node_count, plugins, latency, repeat):
+    """Run all benchmarks against synthetic scene.
+
+    Args:
+        node_count (int): Number of nodes in scene.
+        plugins (HostPlugins): Host plugins used by benchmarks.
+        latency (float): Simulated Harmony processing time per request.
+        repeat (int): How many times each benchmark is called.
+
+    Returns:
+        list[tuple[str, float, float]]: Name, median duration in
+            milliseconds and requests per call of each benchmark.
+
+    """
+    port = random.randrange(49152, 65535)
+    server = Server(port)
+    server.start()
+    client = StandInClient(
+        port, SceneModel.synthetic(node_count), latency=latency
+    )
+    client.start()
+    lib.ProcessContext.server = server
+    lib.invalidate_scene_data()
+    plugins.loaded_node = None
+    try:
+        return [
+            (name, *run_benchmark(func, plugins, client, repeat))
+            for name, func in BENCHMARKS
+        ]
+    finally:
+        client.stop()
+        server.stop()
+        lib.ProcessContext.server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="Node counts of synthetic scenes."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.001,
+        help="Simulated Harmony processing time per request in seconds."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20,
+        help="How many times each operation is measured."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as sequence_dir:
+        _create_sequence(sequence_dir)
+        plugins = HostPlugins(sequence_dir)
+
+        print(
+            f"{'nodes':>6}  {'operation':<22}"
+            f"{'median ms':>10}{'requests':>10}"
+        )
+        for node_count in args.sizes:
+            for name, duration, requests in run_scene(
+                node_count, plugins, args.latency, args.repeat
+            ):
+                print(
+                    f"{node_count:>6}  {name:<22}"
+                    f"{duration:>10.2f}{requests:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Benchmark round-trip latency of requests to Harmony.
+
+Sends small requests from `Server` to `StandInClient` one after another,
+and from multiple threads at once, and reports latency percentiles of the
+round trips. Run it on different revisions to compare latency before and
+after a change of `Server`.
+
+Example:
+    $ python tools/benchmarks/bench_roundtrip.py --count 200 --threads 4
+
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import statistics
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(CURRENT_DIR)), "client"
+)
+sys.path.insert(0, CLIENT_DIR)
+
+from ayon_harmony.api.server import Server  # noqa: E402
+
+from standin import StandInClient, SceneModel  # noqa: E402
+
+
+def _round_trips(server, count, latencies):
+    for _ in range(count):
+        start = time.perf_counter()
+        server.send({"function": "AyonHarmony.getVersion"})
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run(server, count, threads):
+    """Send `count` requests from each of `threads` threads.
+
+    Args:
+        server (Server): Running server with connected client.
+        count (int): Number of requests sent by each thread.
+        threads (int): Number of threads sending requests.
+
+    Returns:
+        tuple[list[float], float]: Latency of each round trip in
+            milliseconds and total seconds.
+
+    """
+    latencies = []
+    workers = [
+        threading.Thread(
+            target=_round_trips, args=(server, count, latencies)
+        )
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--count", type=int, default=200,
+        help="Requests sent by each thread."
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4,
+        help="Threads sending requests at once in concurrent run."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="Simulated Harmony processing time per request in seconds."
+    )
+    args = parser.parse_args()
+
+    port = random.randrange(49152, 65535)
+    server = Server(port)
+    server.start()
+    client = StandInClient(port, SceneModel(), latency=args.latency)
+    client.start()
+    try:
+        print(
+            f"{'threads':>8}{'trips':>8}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'max ms':>10}{'trips/s':>10}"
+        )
+        for threads in sorted({1, args.threads}):
+            latencies, duration = run(server, args.count, threads)
+            latencies.sort()
+            p95 = latencies[round(0.95 * (len(latencies) - 1))]
+            print(
+                f"{threads:>8}{len(latencies):>8}"
+                f"{statistics.median(latencies):>10.2f}{p95:>10.2f}"
+                f"{latencies[-1]:>10.2f}{len(latencies) / duration:>10.1f}"
+            )
+    finally:
+        client.stop()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""Headless stand-in for Harmony side of the communication.
+
+Speaks the same `AH` framing as `TB_sceneOpened.js` and replies to requests
+from a synthetic or recorded scene model, so code talking to Harmony can be
+exercised and benchmarked without Harmony installed.
+
+Used by `bench_ipc.py` next to this module.
+
+Example:
+    >>> from ayon_harmony.api.server import Server
+    >>> from standin import StandInClient, SceneModel
+    >>> server = Server(port)
+    >>> server.start()
+    >>> client = StandInClient(port, SceneModel.synthetic(100), latency=0.001)
+    >>> client.start()
+    >>> server.send({"function": "node.subNodes", "args": ["Top"]})
+
+"""
+import json
+import socket
+import struct
+import threading
+import time
+import logging
+
+
+class SceneModel:
+    """Minimal model of Harmony scene answering host requests.
+
+    Attributes:
+        nodes (list[str]): Full names of nodes under 'Top'.
+        backdrops (list[dict]): Backdrops as returned by `Backdrop.backdrops`.
+        layers (list[dict]): Layers as returned by `getLayerInfos`.
+        palettes (list[str]): Paths of palettes in scene.
+        metadata (dict): Content of 'ayon' scene metadata.
+        metadata_revision (int): Revision of 'ayon' scene metadata.
+        recorded (dict): Replies recorded from real Harmony by request.
+
+    """
+
+    def __init__(
+        self,
+        nodes=None,
+        backdrops=None,
+        layers=None,
+        palettes=None,
+        metadata=None,
+        recorded=None,
+    ):
+        self.nodes = list(nodes or [])
+        self.backdrops = list(backdrops or [])
+        self.layers = list(layers or [])
+        self.palettes = list(palettes or [])
+        self.metadata = dict(metadata or {})
+        self.metadata_revision = 0
+        self.recorded = dict(recorded or {})
+        self.enabled = {}
+
+    @classmethod
+    def synthetic(cls, node_count):
+        """Create scene with `node_count` read nodes loaded as containers.
+
+        Args:
+            node_count (int): Number of nodes in scene.
+
+        Returns:
+            SceneModel: Synthetic scene.
+
+        """
+        nodes = []
+        layers = []
+        metadata = {}
+        for idx in range(node_count):
+            name = f"layer_{idx:04}"
+            node = f"Top/{name}"
+            nodes.append(node)
+            layers.append({
+                "name": name,
+                "color": f"#{idx % 16:02x}0000ff",
+                "fullName": node,
+                "selected": False,
+                "position": idx,
+                "enabled": True,
+            })
+            metadata[node] = {
+                "schema": "openpype:container-2.0",
+                "id": "ayon.load.container",
+                "name": name,
+                "namespace": None,
+                "loader": "ImageSequenceLoader",
+                "representation": f"{idx:032x}",
+                "nodes": [node],
+            }
+        return cls(nodes=nodes, layers=layers, metadata=metadata)
+
+    @classmethod
+    def from_trace(cls, trace_path, **kwargs):
+        """Create scene replaying replies recorded in IPC trace file.
+
+        Trace file is written by server when `AYON_HARMONY_IPC_TRACE` is
+        enabled. Requests not found in the recording are answered by
+        the model itself.
+
+        Args:
+            trace_path (str): Path to trace file.
+            **kwargs: Passed to constructor.
+
+        Returns:
+            SceneModel: Scene replaying recorded replies.
+
+        """
+        recorded = {}
+        with open(trace_path, encoding="utf-8") as stream:
+            for line in stream:
+                _, sep, message = line.partition(" Received [None]: ")
+                if not sep:
+                    continue
+                try:
+                    reply = json.loads(message)
+                except json.decoder.JSONDecodeError:
+                    continue
+                if "function" in reply and "result" in reply:
+                    recorded[cls.request_key(reply)] = reply["result"]
+        return cls(recorded=recorded, **kwargs)
+
+    @staticmethod
+    def request_key(request):
+        return json.dumps(
+            [request.get("function"), request.get("args")], sort_keys=True
+        )
+
+    def call(self, function, args):
+        """Reply to single function call.
+
+        Args:
+            function (str): Called function.
+            args (Any): Arguments of the call.
+
+        Returns:
+            Any: Result of the call.
+
+        """
+        key = self.request_key({"function": function, "args": args})
+        if key in self.recorded:
+            return self.recorded[key]
+
+        handler = self._handlers.get(function)
+        if handler is None:
+            return None
+        return handler(self, args)
+
+    def _get_scene_data(self, _args):
+        return self.metadata
+
+    def _set_scene_data(self, args):
+        self.metadata = dict(args)
+        self.metadata_revision += 1
+        return self.metadata_revision
+
+    def _get_scene_data_revision(self, _args):
+        return self.metadata_revision
+
+    def _patch_scene_data(self, args):
+        upserts, deletes = args
+        self.metadata.update(upserts)
+        for key in deletes:
+            self.metadata.pop(key, None)
+        self.metadata_revision += 1
+        return [self.metadata_revision - 1, self.metadata_revision]
+
+    def _get_scene_data_keys(self, keys):
+        return {
+            key: self.metadata[key] for key in keys if key in self.metadata
+        }
+
+    def _get_nodes(self, _args):
+        return self.nodes
+
+    def _get_backdrops(self, _args):
+        return self.backdrops
+
+    def _get_layer_infos(self, _args):
+        return self.layers
+
+    def _get_palettes_paths(self, _args):
+        return [{"_path": path} for path in self.palettes]
+
+    def _are_enabled(self, nodes):
+        return [self.enabled.get(node, True) for node in nodes]
+
+    def _is_enabled(self, node):
+        return self.enabled.get(node, True)
+
+    def _set_state(self, args):
+        for node, state in zip(*args):
+            self.enabled[node] = state
+        return True
+
+    def _add_node(self, name):
+        node = f"Top/{name}"
+        suffix = 0
+        while node in self.nodes:
+            suffix += 1
+            node = f"Top/{name}_{suffix}"
+        self.nodes.append(node)
+        return node
+
+    def _import_files(self, args):
+        _files, folder_name, product_name = args[:3]
+        return self._add_node(f"{folder_name}_{product_name}")
+
+    def _create_layer_nodes(self, args):
+        _layers, product_name = args
+        return self._add_node(product_name)
+
+    def _delete_node(self, node):
+        if node in self.nodes:
+            self.nodes.remove(node)
+
+    def _get_scene_settings(self, _args):
+        return [
+            "/opt/harmony", "/tmp/scene", "scene", 25.0, 1, 100, "",
+            1920, 1080, 41.112
+        ]
+
+    def _get_version(self, _args):
+        return [22, 0]
+
+    _handlers = {
+        "AyonHarmonyAPI.getSceneData": _get_scene_data,
+        "AyonHarmonyAPI.setSceneData": _set_scene_data,
+        "AyonHarmonyAPI.getSceneDataRevision": _get_scene_data_revision,
+        "AyonHarmonyAPI.patchSceneData": _patch_scene_data,
+        "AyonHarmonyAPI.getSceneDataKeys": _get_scene_data_keys,
+        "AyonHarmonyAPI.areEnabled": _are_enabled,
+        "AyonHarmonyAPI.isEnabled": _is_enabled,
+        "AyonHarmonyAPI.setState": _set_state,
+        "AyonHarmonyAPI.deleteNode": _delete_node,
+        "AyonHarmony.deleteNode": _delete_node,
+        "AyonHarmony.getLayerInfos": _get_layer_infos,
+        "AyonHarmony.getAllPalettesPaths": _get_palettes_paths,
+        "AyonHarmony.getSceneSettings": _get_scene_settings,
+        "AyonHarmony.getVersion": _get_version,
+        "AyonHarmony.Loaders.ImageSequenceLoader.importFiles": _import_files,
+        "AyonHarmony.Creators.CreateRenderLayer.createLayerNodes": (
+            _create_layer_nodes
+        ),
+        "node.subNodes": _get_nodes,
+        "node.getNodes": _get_nodes,
+        "Backdrop.backdrops": _get_backdrops,
+    }
+
+
+class StandInClient(threading.Thread):
+    """Client replying to server requests instead of Harmony.
+
+    Args:
+        port (int): Port of running `Server`.
+        scene (SceneModel): Model answering the requests.
+        latency (float): Seconds to wait before each reply to simulate
+            Harmony processing time.
+
+    """
+
+    def __init__(self, port, scene=None, latency=0.0):
+        super(StandInClient, self).__init__()
+        self.daemon = True
+        self.scene = scene or SceneModel()
+        self.latency = latency
+        self.log = logging.getLogger(__name__)
+        self.socket = socket.create_connection(("127.0.0.1", port))
+        self.requests_count = 0
+
+    def run(self):
+        buffer = b""
+        while True:
+            try:
+                data = self.socket.recv(1024 * 1024)
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            while len(buffer) >= 6:
+                length = struct.unpack(">I", buffer[2:6])[0]
+                if len(buffer) < 6 + length:
+                    break
+                message = buffer[6:6 + length].decode("utf-8")
+                buffer = buffer[6 + length:]
+                self._process_message(json.loads(message))
+
+    def stop(self):
+        self.socket.close()
+
+    def _process_message(self, request):
+        if "reply" in request or "capabilities" in request:
+            return
+
+        self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if "batch" in request:
+            request["result"] = [
+                self.scene.call(call["function"], call.get("args"))
+                for call in request["batch"]
+            ]
+        elif "function" in request:
+            request["result"] = self.scene.call(
+                request["function"], request.get("args")
+            )
+        else:
+            request["result"] = None
+
+        request["reply"] = True
+        self._send(json.dumps(request))
+
+    def _send(self, message):
+        # Header length is sent as 8 hex characters as by Harmony client.
+        encoded = message.encode("utf-8")
+        header = b"AH" + "{:08x}".format(len(encoded)).encode()
+        self.socket.sendall(header + encoded)